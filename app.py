@@ -1,22 +1,63 @@
-from flask import Flask, send_from_directory
+from flask import Flask, Response, abort, request, send_from_directory
 from flask_cors import CORS
+from werkzeug.security import safe_join
 from db import init_db
 from routes import bp as business_routes
+from cleanup_uploads import start_background_reconciler
+import image_store
+import mimetypes
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Optional offload of upload bytes to the front proxy: "x-accel-redirect" (nginx) or "x-sendfile"
+UPLOADS_OFFLOAD = os.environ.get("UPLOADS_OFFLOAD", "").lower()
+UPLOADS_ACCEL_PREFIX = os.environ.get("UPLOADS_ACCEL_PREFIX", "/protected-uploads/")
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+LEGACY_UPLOAD_MAX_AGE = 60 * 60
+# Seconds between background upload/table reconciliation passes (0 disables)
+UPLOADS_GC_INTERVAL = int(os.environ.get("UPLOADS_GC_INTERVAL", 0))
+
 app = Flask(__name__)
+app.config["USE_X_SENDFILE"] = UPLOADS_OFFLOAD == "x-sendfile"
 CORS(app, origins="*", supports_credentials=True)
 init_db()
 
+if UPLOADS_GC_INTERVAL > 0:
+    start_background_reconciler(UPLOADS_GC_INTERVAL)
+
 app.register_blueprint(business_routes)
 
-@app.route('/uploads/<filename>')
+@app.route('/uploads/<path:filename>')
 def uploaded_file(filename):
-    return send_from_directory('uploads', filename)
+    # Content-addressed blobs never change, so the digest is a strong ETag and
+    # they can be cached forever; legacy timestamped uploads get a short max-age
+    digest = image_store.digest_from_path(filename)
+    max_age = IMMUTABLE_MAX_AGE if digest else LEGACY_UPLOAD_MAX_AGE
+
+    if UPLOADS_OFFLOAD == "x-accel-redirect":
+        filepath = safe_join(os.path.join(app.root_path, image_store.UPLOAD_FOLDER), filename)
+        if filepath is None or not os.path.isfile(filepath):
+            abort(404)
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response.headers["X-Accel-Redirect"] = UPLOADS_ACCEL_PREFIX + filename
+        if digest:
+            response.set_etag(digest)
+        response.make_conditional(request)
+    else:
+        # conditional=True answers If-None-Match and Range requests
+        response = send_from_directory(
+            image_store.UPLOAD_FOLDER, filename,
+            conditional=True, etag=digest or True, max_age=max_age
+        )
+
+    response.cache_control.public = True
+    response.cache_control.max_age = max_age
+    if digest:
+        response.cache_control.immutable = True
+    return response
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5001)) 
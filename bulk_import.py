@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Streaming bulk import of businesses and reviews from NDJSON.
+
+Each line is one JSON object. Business lines use the same fields as
+POST /businesses (plus optional "ref", "latitude" and "longitude");
+review lines carry "type": "review" and either a "business_id" or the
+"business_ref" of a business imported earlier in the same stream.
+Rows are validated and inserted in chunks, one transaction per chunk;
+geocoding is deferred to geocode_pending().
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+
+from db import (
+    DB_PATH, assign_dimensions, business_hours_rows, init_db, insert_business_children, normalize_businesses,
+    service_pricing_rows
+)
+from market_stats import business_price_keys, refresh_market_stats
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+BUSINESS_REQUIRED_FIELDS = ["name", "category", "description", "services"]
+BUSINESS_OPTIONAL_TEXT_FIELDS = ["image_url", "location", "business_hours"]
+PRICE_FIELDS = ["current_price", "recommended_price", "confidence_score"]
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _pricing_error(service_pricing):
+    """Error message for a malformed service_pricing object, or None"""
+    if not isinstance(service_pricing, dict) or not all(isinstance(p, dict) for p in service_pricing.values()):
+        return "service_pricing must be an object of objects"
+    for service_name, pricing_data in service_pricing.items():
+        for field in PRICE_FIELDS:
+            if pricing_data.get(field) is not None and not _is_number(pricing_data[field]):
+                return f"service_pricing.{service_name}.{field} must be a number"
+        if not isinstance(pricing_data.get("pricing_strategy", ""), str):
+            return f"service_pricing.{service_name}.pricing_strategy must be a string"
+    return None
+
+def _hours_error(hours):
+    """Error message for a malformed hours list, or None"""
+    if not isinstance(hours, list) or not all(isinstance(h, dict) for h in hours):
+        return "hours must be a list of objects"
+    for hour in hours:
+        day_of_week = hour.get("day_of_week")
+        if not _is_int(day_of_week) or not 0 <= day_of_week <= 6:
+            return "hours.day_of_week must be an integer between 0 and 6"
+        for field in ("open_time", "close_time"):
+            if hour.get(field) is not None and not isinstance(hour[field], str):
+                return f"hours.{field} must be a string"
+    return None
+
+def validate_business(row, owner_id=None):
+    """Return (record, None) for a valid business line or (None, error message)"""
+    missing = [field for field in BUSINESS_REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        return None, f"Missing fields: {', '.join(missing)}"
+    for field in BUSINESS_REQUIRED_FIELDS + BUSINESS_OPTIONAL_TEXT_FIELDS:
+        if row.get(field) is not None and not isinstance(row[field], str):
+            return None, f"{field} must be a string"
+    if not isinstance(row.get("ref"), (str, int, type(None))):
+        return None, "ref must be a string or integer"
+    if not isinstance(row.get("socials", {}), (dict, type(None))):
+        return None, "socials must be an object"
+    if row.get("rating") is not None and not _is_number(row["rating"]):
+        return None, "rating must be a number"
+    if owner_id is None and row.get("owner_id") is not None and not _is_int(row["owner_id"]):
+        return None, "owner_id must be an integer"
+
+    service_pricing = row.get("service_pricing") or {}
+    error = _pricing_error(service_pricing)
+    if error:
+        return None, error
+
+    hours = row.get("hours") or []
+    error = _hours_error(hours)
+    if error:
+        return None, error
+
+    latitude, longitude = row.get("latitude"), row.get("longitude")
+    try:
+        latitude = float(latitude) if latitude is not None else None
+        longitude = float(longitude) if longitude is not None else None
+    except (TypeError, ValueError):
+        return None, "latitude/longitude must be numbers"
+
+    return {
+        "ref": row.get("ref"),
+        "values": [
+            row["name"],
+            row["category"],
+            row["description"],
+            row["services"],
+            json.dumps(service_pricing),
+            row.get("image_url", ""),
+            row.get("location", ""),
+            latitude,
+            longitude,
+            json.dumps(row.get("socials", {})),
+            row.get("rating"),
+            owner_id if owner_id is not None else row.get("owner_id"),
+            row.get("business_hours", "")
+        ],
+        "service_pricing": service_pricing,
+        "hours": hours
+    }, None
+
+def validate_review(row):
+    """Return (record, None) for a valid review line or (None, error message)"""
+    rating, user_id = row.get("rating"), row.get("user_id")
+    if not _is_int(rating) or not _is_int(user_id):
+        return None, "rating and user_id must be integers"
+    if not 1 <= rating <= 5:
+        return None, "Rating must be between 1 and 5"
+
+    text = row.get("text") or ""
+    if not isinstance(text, str):
+        return None, "Review text must be a string"
+    text = text.strip()
+    if not 10 <= len(text) <= 1000:
+        return None, "Review text must be between 10 and 1000 characters"
+
+    name = row.get("name")
+    if name is not None and not isinstance(name, str):
+        return None, "Name must be a string"
+    if name is not None and len(name) > 50:
+        return None, "Name must be at most 50 characters"
+
+    if row.get("created_at") is not None and not isinstance(row["created_at"], str):
+        return None, "created_at must be a string"
+    business_id, business_ref = row.get("business_id"), row.get("business_ref")
+    if business_id is None and business_ref is None:
+        return None, "business_id or business_ref is required"
+    if business_id is not None and not _is_int(business_id):
+        return None, "business_id must be an integer"
+    if not isinstance(business_ref, (str, int, type(None))):
+        return None, "business_ref must be a string or integer"
+
+    return {
+        "business_id": row.get("business_id"),
+        "business_ref": row.get("business_ref"),
+        "values": [user_id, name, rating, text, row.get("created_at")]
+    }, None
+
+def _insert_businesses(conn, records, refs):
+    """Insert a chunk of businesses with pre-assigned ids so children can use executemany.
+
+    Runs under BEGIN IMMEDIATE, so nobody else can take ids from the sequence meanwhile.
+    """
+    seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'businesses'").fetchone()
+    max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM businesses").fetchone()[0]
+    next_id = max(seq[0] if seq else 0, max_id) + 1
+
+    business_rows, pricing_rows, hours_rows = [], [], []
+    for offset, record in enumerate(records):
+        business_id = next_id + offset
+        business_rows.append([business_id] + record["values"])
+        pricing_rows.extend(service_pricing_rows(business_id, record["service_pricing"]))
+        hours_rows.extend(business_hours_rows(business_id, record["hours"]))
+        if record["ref"] is not None:
+            refs[record["ref"]] = business_id
+
+    conn.executemany(
+        """
+        INSERT INTO businesses (id, name, category, description, services, service_pricing, image_url, location, latitude, longitude, socials, rating, owner_id, business_hours)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        business_rows
+    )
+    insert_business_children(conn, pricing_rows, hours_rows)
+    business_ids = [row[0] for row in business_rows]
+    # Market groups are keyed by dimension ids, so resolve those first
+    assign_dimensions(conn)
+    refresh_market_stats(conn, business_price_keys(conn, business_ids))
+    normalize_businesses(conn)
+    return business_ids
+
+def _insert_reviews(conn, records, refs, report):
+    """Resolve business references for a chunk of reviews and insert the valid ones"""
+    direct_ids = {record["business_id"] for record in records if record["business_id"] is not None}
+    existing = set()
+    if direct_ids:
+        placeholders = ",".join(["?" for _ in direct_ids])
+        existing = {row[0] for row in conn.execute(
+            f"SELECT id FROM businesses WHERE id IN ({placeholders})", list(direct_ids)
+        )}
+
+    review_rows = []
+    for record in records:
+        if record["business_id"] is not None:
+            business_id = record["business_id"] if record["business_id"] in existing else None
+        else:
+            business_id = refs.get(record["business_ref"])
+        if business_id is None:
+            _add_error(report, record["line"], "Business not found")
+            continue
+        review_rows.append([business_id] + record["values"])
+
+    conn.executemany(
+        """
+        INSERT INTO reviews (business_id, user_id, name, rating, text, created_at)
+        VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        """,
+        review_rows
+    )
+    return len(review_rows)
+
+def _add_error(report, line_no, message):
+    report["error_count"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line_no, "error": message})
+
+def import_ndjson(conn, lines, owner_id=None, allow_reviews=True, chunk_size=CHUNK_SIZE, inserted_ids=None):
+    """Import an iterable of NDJSON lines (str or bytes) and return a report dict.
+
+    owner_id, when given, owns every imported business regardless of the
+    line's own owner_id. inserted_ids, when given, is extended with the ids
+    of the businesses written. Only one chunk of parsed rows is held in
+    memory at a time; each chunk is written in a single transaction.
+    """
+    report = {"businesses": 0, "reviews": 0, "error_count": 0, "errors": []}
+    refs = {}
+    businesses, reviews = [], []
+
+    def flush():
+        if not businesses and not reviews:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            business_ids = _insert_businesses(conn, businesses, refs) if businesses else []
+            inserted_reviews = _insert_reviews(conn, reviews, refs, report) if reviews else 0
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            for record in businesses:
+                refs.pop(record["ref"], None)
+            for record in businesses + reviews:
+                _add_error(report, record["line"], f"Database error: {e}")
+            businesses.clear()
+            reviews.clear()
+            return
+        except Exception:
+            # Never leave the connection inside an open transaction
+            conn.rollback()
+            raise
+        report["businesses"] += len(businesses)
+        if inserted_ids is not None:
+            inserted_ids.extend(business_ids)
+        report["reviews"] += inserted_reviews
+        businesses.clear()
+        reviews.clear()
+
+    for line_no, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            _add_error(report, line_no, f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            _add_error(report, line_no, "Each line must be a JSON object")
+            continue
+
+        row_type = row.get("type", "business")
+        if row_type == "business":
+            record, error = validate_business(row, owner_id)
+            target = businesses
+        elif row_type == "review" and not allow_reviews:
+            record, error = None, "Review import is not allowed for this user"
+        elif row_type == "review":
+            record, error = validate_review(row)
+            target = reviews
+        else:
+            record, error = None, f"Unknown type: {row_type}"
+
+        if error:
+            _add_error(report, line_no, error)
+            continue
+        record["line"] = line_no
+        target.append(record)
+
+        if len(businesses) + len(reviews) >= chunk_size:
+            flush()
+
+    flush()
+    return report
+
+def geocode_pending(conn, geocode, business_ids, batch_size=100):
+    """Fill in coordinates for the given businesses that were imported without them.
+
+    Only these ids are looked at, so addresses that failed in earlier imports
+    are not sent to the geocoder again. Returns how many were geocoded.
+    """
+    geocoded = 0
+    for start in range(0, len(business_ids), batch_size):
+        batch = business_ids[start:start + batch_size]
+        placeholders = ",".join(["?" for _ in batch])
+        rows = conn.execute(
+            f"""
+            SELECT id, location FROM businesses
+            WHERE id IN ({placeholders}) AND latitude IS NULL AND location IS NOT NULL AND location != ''
+            """,
+            batch
+        ).fetchall()
+        if not rows:
+            continue
+
+        updates = []
+        for business_id, location in rows:
+            latitude, longitude = geocode(location)
+            if latitude is not None:
+                updates.append((latitude, longitude, business_id))
+        conn.executemany("UPDATE businesses SET latitude = ?, longitude = ? WHERE id = ?", updates)
+        conn.commit()
+        geocoded += len(updates)
+    return geocoded
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import businesses and reviews from NDJSON")
+    parser.add_argument("path", help="NDJSON file to import, or - for stdin")
+    parser.add_argument("--owner-id", type=int, help="owner for every imported business (default: each line's owner_id)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help=f"rows validated and written per transaction (default: {CHUNK_SIZE})")
+    parser.add_argument("--geocode", action="store_true", help="geocode imported addresses after the import")
+    args = parser.parse_args()
+
+    print("📦 Bulk Import")
+    print("=" * 50)
+
+    init_db()
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    with stream, sqlite3.connect(DB_PATH) as conn:
+        business_ids = []
+        report = import_ndjson(conn, stream, owner_id=args.owner_id, chunk_size=args.chunk_size,
+                               inserted_ids=business_ids)
+
+        print(f"✅ Imported {report['businesses']} businesses and {report['reviews']} reviews.")
+        if report["error_count"]:
+            print(f"⚠️  {report['error_count']} lines were rejected:")
+            for error in report["errors"]:
+                print(f"  line {error['line']}: {error['error']}")
+
+        if args.geocode:
+            from routes import geocode_address
+            print("🌍 Geocoding imported addresses...")
+            print(f"✅ Geocoded {geocode_pending(conn, geocode_address, business_ids)} businesses.")
+
+if __name__ == "__main__":
+    main()
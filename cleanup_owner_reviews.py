@@ -2,106 +2,138 @@
 """
 Script to clean up reviews made by business owners on their own businesses.
 This script identifies and removes such reviews to maintain review integrity.
+
+Run with --dry-run to only report, or --yes to delete without prompting (cron).
+Business ratings follow the deletions through the review triggers in db.py.
+Exits non-zero if the cleanup fails.
 """
 
+import argparse
 import sqlite3
+import sys
 from pathlib import Path
 
 DB_PATH = Path("businesses.db")
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_SHOW = 20
+
+def find_owner_reviews(conn):
+    """Collect owner-written reviews into a temp table and return how many were found"""
+    conn.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS owner_review_targets (
+            review_id INTEGER PRIMARY KEY,
+            business_id INTEGER NOT NULL
+        )
+    """)
+    conn.execute("DELETE FROM owner_review_targets")
+    conn.execute("""
+        INSERT INTO owner_review_targets (review_id, business_id)
+        SELECT r.id, r.business_id
+        FROM reviews r
+        JOIN businesses b ON r.business_id = b.id
+        WHERE r.user_id = b.owner_id
+    """)
+    conn.commit()
+    return conn.execute("SELECT COUNT(*) FROM owner_review_targets").fetchone()[0]
+
+def print_owner_reviews(conn, show):
+    cursor = conn.execute("""
+        SELECT r.id, r.business_id, r.user_id, r.name, r.rating, r.text, r.created_at,
+               b.name as business_name, u.email as user_email
+        FROM owner_review_targets t
+        JOIN reviews r ON r.id = t.review_id
+        JOIN businesses b ON r.business_id = b.id
+        LEFT JOIN users u ON r.user_id = u.id
+        ORDER BY t.review_id
+        LIMIT ?
+    """, (show,))
+
+    for review in cursor:
+        print(f"Review ID: {review['id']}")
+        print(f"Business: {review['business_name']} (ID: {review['business_id']})")
+        print(f"Owner: {review['user_email']} (ID: {review['user_id']})")
+        print(f"Rating: {review['rating']}/5")
+        print(f"Text: {review['text'][:100]}{'...' if len(review['text']) > 100 else ''}")
+        print(f"Created: {review['created_at']}")
+        print("-" * 80)
+
+def delete_owner_reviews(conn, chunk_size):
+    """Delete the collected reviews in id-ordered chunks, committing after each one
+    so the write lock is only ever held for a single chunk"""
+    deleted = 0
+    last_id = 0
+    while True:
+        review_ids = [row[0] for row in conn.execute(
+            "SELECT review_id FROM owner_review_targets WHERE review_id > ? ORDER BY review_id LIMIT ?",
+            (last_id, chunk_size)
+        )]
+        if not review_ids:
+            break
+
+        placeholders = ','.join(['?' for _ in review_ids])
+        cursor = conn.execute(f"DELETE FROM reviews WHERE id IN ({placeholders})", review_ids)
+        conn.commit()
+
+        deleted += cursor.rowcount
+        last_id = review_ids[-1]
+    return deleted
 
-def cleanup_owner_reviews():
+def cleanup_owner_reviews(dry_run=False, assume_yes=False, chunk_size=DEFAULT_CHUNK_SIZE, show=DEFAULT_SHOW):
     """Remove reviews made by business owners on their own businesses"""
     with sqlite3.connect(DB_PATH) as conn:
         conn.row_factory = sqlite3.Row
         
         # Find reviews where the reviewer is also the business owner
-        cursor = conn.execute("""
-            SELECT r.id, r.business_id, r.user_id, r.name, r.rating, r.text, r.created_at,
-                   b.name as business_name, u.email as user_email
-            FROM reviews r
-            JOIN businesses b ON r.business_id = b.id
-            JOIN users u ON r.user_id = u.id
-            WHERE r.user_id = b.owner_id
-        """)
+        total = find_owner_reviews(conn)
         
-        owner_reviews = cursor.fetchall()
-        
-        if not owner_reviews:
+        if not total:
             print("✅ No reviews found where business owners reviewed their own businesses.")
             return
         
-        print(f"⚠️  Found {len(owner_reviews)} reviews made by business owners on their own businesses:")
+        print(f"⚠️  Found {total} reviews made by business owners on their own businesses:")
         print("-" * 80)
+        print_owner_reviews(conn, show)
+        if total > show:
+            print(f"... and {total - show} more")
         
-        for review in owner_reviews:
-            print(f"Review ID: {review['id']}")
-            print(f"Business: {review['business_name']} (ID: {review['business_id']})")
-            print(f"Owner: {review['user_email']} (ID: {review['user_id']})")
-            print(f"Rating: {review['rating']}/5")
-            print(f"Text: {review['text'][:100]}{'...' if len(review['text']) > 100 else ''}")
-            print(f"Created: {review['created_at']}")
-            print("-" * 80)
+        if dry_run:
+            print("ℹ️  Dry run: no reviews were deleted.")
+            return
         
         # Ask for confirmation
-        response = input(f"\nDo you want to delete these {len(owner_reviews)} reviews? (y/N): ")
+        if not assume_yes:
+            response = input(f"\nDo you want to delete these {total} reviews? (y/N): ")
+            if response.lower() != 'y':
+                print("❌ Cleanup cancelled.")
+                return
         
-        if response.lower() == 'y':
-            # Delete the reviews
-            review_ids = [review['id'] for review in owner_reviews]
-            placeholders = ','.join(['?' for _ in review_ids])
-            
-            conn.execute(f"DELETE FROM reviews WHERE id IN ({placeholders})", review_ids)
-            conn.commit()
-            
-            print(f"✅ Successfully deleted {len(owner_reviews)} reviews made by business owners.")
-            
-            # Update business ratings
-            print("🔄 Updating business ratings...")
-            update_business_ratings(conn)
-            
-        else:
-            print("❌ Cleanup cancelled.")
-
-def update_business_ratings(conn):
-    """Update business ratings after removing owner reviews"""
-    # Get all businesses that have reviews
-    cursor = conn.execute("""
-        SELECT DISTINCT business_id 
-        FROM reviews
-    """)
-    
-    business_ids = [row['business_id'] for row in cursor.fetchall()]
-    
-    for business_id in business_ids:
-        # Calculate new average rating
-        avg_result = conn.execute("""
-            SELECT AVG(rating) as avg_rating, COUNT(*) as total_reviews 
-            FROM reviews 
-            WHERE business_id = ?
-        """, (business_id,)).fetchone()
-        
-        if avg_result['avg_rating']:
-            conn.execute("""
-                UPDATE businesses 
-                SET rating = ? 
-                WHERE id = ?
-            """, (round(avg_result['avg_rating'], 1), business_id))
-    
-    conn.commit()
-    print("✅ Business ratings updated.")
+        deleted = delete_owner_reviews(conn, chunk_size)
+        print(f"✅ Successfully deleted {deleted} reviews made by business owners.")
 
 def main():
+    parser = argparse.ArgumentParser(description="Remove reviews business owners wrote on their own businesses")
+    parser.add_argument("--dry-run", action="store_true", help="only report matching reviews")
+    parser.add_argument("--yes", action="store_true", help="delete without asking for confirmation")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"reviews deleted per transaction (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--show", type=int, default=DEFAULT_SHOW,
+                        help=f"number of matching reviews to print (default: {DEFAULT_SHOW})")
+    args = parser.parse_args()
+
     print("🧹 Business Owner Review Cleanup Script")
     print("=" * 50)
     
     if not DB_PATH.exists():
         print(f"❌ Database file not found: {DB_PATH}")
-        return
+        return 1
     
     try:
-        cleanup_owner_reviews()
+        cleanup_owner_reviews(dry_run=args.dry_run, assume_yes=args.yes,
+                              chunk_size=args.chunk_size, show=args.show)
     except Exception as e:
         print(f"❌ Error during cleanup: {e}")
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Script to reconcile the uploads folder with the business_images table and
+business covers (businesses.image_url). Deletes stored files nothing
+references (cascaded business deletes, failed inserts, abandoned partial
+uploads) and reports rows whose file is missing.
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+
+import image_store
+from db import DB_PATH
+
+def reconcile_uploads(batch_size=500, temp_grace_seconds=3600, dry_run=False, report_dangling=True):
+    """Run one reconciliation pass and return its statistics"""
+    with sqlite3.connect(DB_PATH) as conn:
+        stats = image_store.delete_orphan_files(
+            conn,
+            batch_size=batch_size,
+            temp_grace_seconds=temp_grace_seconds,
+            dry_run=dry_run
+        )
+
+        stats["dangling"] = 0
+        for image_id, business_id, image_url in image_store.iter_dangling_references(conn, batch_size):
+            stats["dangling"] += 1
+            if report_dangling:
+                print(f"⚠️  Missing file for image {image_id} (business {business_id}): {image_url}")
+
+    return stats
+
+def start_background_reconciler(interval_seconds, batch_size=500):
+    """Run reconcile_uploads every interval_seconds on a daemon thread"""
+    def loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                stats = reconcile_uploads(batch_size=batch_size, report_dangling=False)
+                if stats["orphans"] or stats["stale_temp"] or stats["dangling"]:
+                    print(f"Upload reconciler: {stats}")
+            except Exception as e:
+                print(f"Upload reconciler error: {e}")
+
+    thread = threading.Thread(target=loop, name="upload-reconciler", daemon=True)
+    thread.start()
+    return thread
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconcile uploads/ with business_images and business covers")
+    parser.add_argument("--dry-run", action="store_true", help="report what would be deleted without deleting")
+    parser.add_argument("--batch-size", type=int, default=500, help="files/rows checked per query (default: 500)")
+    parser.add_argument("--temp-grace", type=int, default=3600,
+                        help="seconds before an unfinished upload temp file is considered abandoned (default: 3600)")
+    args = parser.parse_args()
+
+    print("🧹 Upload Reconciliation Script")
+    print("=" * 50)
+
+    if not DB_PATH.exists():
+        print(f"❌ Database file not found: {DB_PATH}")
+        return
+
+    try:
+        stats = reconcile_uploads(
+            batch_size=args.batch_size,
+            temp_grace_seconds=args.temp_grace,
+            dry_run=args.dry_run
+        )
+    except Exception as e:
+        print(f"❌ Error during reconciliation: {e}")
+        return
+
+    action = "Would delete" if args.dry_run else "Deleted"
+    print(f"Scanned {stats['scanned']} stored files.")
+    print(f"✅ {action} {stats['orphans']} orphaned files and {stats['stale_temp']} stale temp files "
+          f"({stats['bytes_freed'] / 1024 / 1024:.1f} MB).")
+    if stats["dangling"]:
+        print(f"⚠️  {stats['dangling']} image rows point at missing files.")
+    else:
+        print("✅ No dangling image references.")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
+import json
 import sqlite3
 from pathlib import Path
 
+from text_normalize import normalize_text
+
 DB_PATH = Path("businesses.db")
 
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
 def init_db() -> None:
     """Create the businesses table if not exists"""
     with sqlite3.connect(DB_PATH) as conn:
@@ -27,6 +33,14 @@ def init_db() -> None:
                 ai_analysis_data TEXT,
                 market_position TEXT DEFAULT 'competitive',
                 revenue_potential_score REAL DEFAULT 0.7,
+                text_revision INTEGER DEFAULT 0,
+                search_revision INTEGER DEFAULT 0,
+                category_id INTEGER REFERENCES categories (id),
+                location_id INTEGER REFERENCES locations (id),
+                name_norm TEXT,
+                description_norm TEXT,
+                category_norm TEXT,
+                location_norm TEXT,
                 FOREIGN KEY (owner_id) REFERENCES users (id) ON DELETE SET NULL
             )
         """)
@@ -43,6 +57,7 @@ def init_db() -> None:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 business_id INTEGER NOT NULL,
                 image_url TEXT NOT NULL,
+                content_hash TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (business_id) REFERENCES businesses (id) ON DELETE CASCADE
             )
@@ -97,7 +112,15 @@ def init_db() -> None:
             ("service_pricing", "TEXT"),
             ("ai_analysis_data", "TEXT"),
             ("market_position", "TEXT DEFAULT 'competitive'"),
-            ("revenue_potential_score", "REAL DEFAULT 0.7")
+            ("revenue_potential_score", "REAL DEFAULT 0.7"),
+            ("text_revision", "INTEGER DEFAULT 0"),
+            ("search_revision", "INTEGER DEFAULT 0"),
+            ("category_id", "INTEGER REFERENCES categories(id)"),
+            ("location_id", "INTEGER REFERENCES locations(id)"),
+            ("name_norm", "TEXT"),
+            ("description_norm", "TEXT"),
+            ("category_norm", "TEXT"),
+            ("location_norm", "TEXT")
         ]
         
         for column_name, column_def in columns_to_add:
@@ -107,8 +130,718 @@ def init_db() -> None:
                 # Column already exists
                 pass
         
+        try:
+            conn.execute("ALTER TABLE business_images ADD COLUMN content_hash TEXT")
+        except sqlite3.OperationalError:
+            # Column already exists
+            pass
+        
+        # Reference counting for content-addressed uploads looks rows up by URL; covers share the blobs
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_business_images_image_url ON business_images (image_url)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_businesses_image_url ON businesses (image_url)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_business_images_business_id ON business_images (business_id)")
+        
+        # Review listing is filtered by business and paged newest-first by (created_at, id);
+        # the listed columns ride along so pages (and skipped OFFSET rows) never touch the table
+        conn.execute("DROP INDEX IF EXISTS idx_reviews_business_created")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_reviews_business_page
+            ON reviews (business_id, created_at DESC, id DESC, name, rating, text)
+        """)
+
+        init_review_stats(conn)
+        init_open_intervals(conn)
+        init_price_schedules(conn)
+        init_price_history(conn)
+        init_dimensions(conn)
+        init_market_stats(conn)
+        init_normalized_text(conn)
+        init_revisions(conn)
+
         conn.commit()
 
+def init_open_intervals(conn) -> None:
+    """Create the minute-of-week open interval table used by open_now / open_at search"""
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'business_open_intervals'"
+    ).fetchone() is None
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS business_open_intervals (
+            business_id INTEGER NOT NULL,
+            day_of_week INTEGER NOT NULL,
+            start_minute INTEGER NOT NULL,
+            end_minute INTEGER NOT NULL,
+            FOREIGN KEY (business_id) REFERENCES businesses (id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_open_intervals_start ON business_open_intervals (start_minute, end_minute, business_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_open_intervals_business ON business_open_intervals (business_id, day_of_week)")
+
+    # One row per business and day, so saves can upsert just the days that changed
+    has_unique_days = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_business_hours_business_day'"
+    ).fetchone()
+    if not has_unique_days:
+        conn.execute("""
+            DELETE FROM business_hours
+            WHERE id NOT IN (SELECT MAX(id) FROM business_hours GROUP BY business_id, day_of_week)
+        """)
+        conn.execute("CREATE UNIQUE INDEX idx_business_hours_business_day ON business_hours (business_id, day_of_week)")
+
+    if created:
+        cursor = conn.execute("SELECT business_id, day_of_week, open_time, close_time, is_closed FROM business_hours")
+        while True:
+            rows = cursor.fetchmany(1000)
+            if not rows:
+                break
+            _insert_open_intervals(conn, open_interval_rows(rows))
+
+def init_market_stats(conn) -> None:
+    """Create the materialized market price statistics table (see market_stats.py).
+
+    Runs after init_dimensions(), since groups are keyed by category_id/location_id.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(market_price_stats)")}
+    if "category" in columns:
+        # Groups used to be keyed by the free-text location, i.e. one street address each
+        conn.execute("DROP TABLE market_price_stats")
+        conn.execute("DROP INDEX IF EXISTS idx_businesses_category_location")
+        columns = set()
+    created = not columns
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS market_price_stats (
+            category_id INTEGER NOT NULL,
+            location_id INTEGER NOT NULL,
+            service_name TEXT NOT NULL,
+            sample_count INTEGER NOT NULL,
+            mean_price REAL,
+            p25_price REAL,
+            p50_price REAL,
+            p75_price REAL,
+            min_price REAL,
+            max_price REAL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (category_id, location_id, service_name)
+        )
+    """)
+    # Incremental refreshes look groups up by business (category_id, location_id) and service
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_businesses_category_location_id ON businesses (category_id, location_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_service_pricing_business_service ON service_pricing (business_id, service_name)")
+
+    if created:
+        from market_stats import rebuild_market_stats
+        rebuild_market_stats(conn)
+
+def init_price_schedules(conn) -> None:
+    """Create the compiled dynamic pricing schedules table (see dynamic_pricing.py)"""
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'dynamic_price_schedules'"
+    ).fetchone() is None
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS dynamic_price_schedules (
+            business_id INTEGER NOT NULL,
+            service_name TEXT NOT NULL,
+            weekly_prices BLOB NOT NULL,
+            monthly_multipliers BLOB NOT NULL,
+            min_price REAL,
+            max_price REAL,
+            PRIMARY KEY (business_id, service_name),
+            FOREIGN KEY (business_id) REFERENCES businesses (id) ON DELETE CASCADE
+        )
+    """)
+    
+    if created:
+        # Compile configs saved before schedules existed
+        from dynamic_pricing import compile_schedules, validate_config
+        for business_id, config_json in conn.execute(
+            "SELECT id, dynamic_pricing_config FROM businesses WHERE dynamic_pricing_config IS NOT NULL"
+        ).fetchall():
+            try:
+                config = json.loads(config_json)
+            except ValueError:
+                continue
+            if validate_config(config) is None:
+                compile_schedules(conn, business_id, config)
+
+def init_review_stats(conn) -> None:
+    """Create per-business running review aggregates, kept current by triggers on reviews"""
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'business_rating_stats'"
+    ).fetchone() is None
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS business_rating_stats (
+            business_id INTEGER PRIMARY KEY,
+            rating_sum INTEGER NOT NULL DEFAULT 0,
+            review_count INTEGER NOT NULL DEFAULT 0,
+            stars_1 INTEGER NOT NULL DEFAULT 0,
+            stars_2 INTEGER NOT NULL DEFAULT 0,
+            stars_3 INTEGER NOT NULL DEFAULT 0,
+            stars_4 INTEGER NOT NULL DEFAULT 0,
+            stars_5 INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (business_id) REFERENCES businesses (id) ON DELETE CASCADE
+        )
+    """)
+
+    # Triggers run inside the writer's transaction, so the aggregates can never
+    # drift from the reviews table whichever code path inserts or deletes
+    add_review = """
+        INSERT INTO business_rating_stats (business_id, rating_sum, review_count, stars_1, stars_2, stars_3, stars_4, stars_5)
+        VALUES ({row}.business_id, {row}.rating, 1, {row}.rating = 1, {row}.rating = 2, {row}.rating = 3, {row}.rating = 4, {row}.rating = 5)
+        ON CONFLICT (business_id) DO UPDATE SET
+            rating_sum = rating_sum + excluded.rating_sum,
+            review_count = review_count + 1,
+            stars_1 = stars_1 + excluded.stars_1,
+            stars_2 = stars_2 + excluded.stars_2,
+            stars_3 = stars_3 + excluded.stars_3,
+            stars_4 = stars_4 + excluded.stars_4,
+            stars_5 = stars_5 + excluded.stars_5;
+    """
+    remove_review = """
+        UPDATE business_rating_stats SET
+            rating_sum = rating_sum - {row}.rating,
+            review_count = review_count - 1,
+            stars_1 = stars_1 - ({row}.rating = 1),
+            stars_2 = stars_2 - ({row}.rating = 2),
+            stars_3 = stars_3 - ({row}.rating = 3),
+            stars_4 = stars_4 - ({row}.rating = 4),
+            stars_5 = stars_5 - ({row}.rating = 5)
+        WHERE business_id = {row}.business_id;
+    """
+    # Keep the denormalized businesses.rating / total_reviews columns in step
+    sync_business = """
+        UPDATE businesses SET
+            rating = COALESCE((SELECT ROUND(CAST(rating_sum AS REAL) / review_count, 1)
+                               FROM business_rating_stats
+                               WHERE business_id = {row}.business_id AND review_count > 0), 0),
+            total_reviews = COALESCE((SELECT review_count FROM business_rating_stats
+                                      WHERE business_id = {row}.business_id), 0)
+        WHERE id = {row}.business_id;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_insert AFTER INSERT ON reviews
+        BEGIN
+            {add_review.format(row="NEW")}
+            {sync_business.format(row="NEW")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_delete AFTER DELETE ON reviews
+        BEGIN
+            {remove_review.format(row="OLD")}
+            {sync_business.format(row="OLD")}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_update AFTER UPDATE OF rating, business_id ON reviews
+        BEGIN
+            {remove_review.format(row="OLD")}
+            {add_review.format(row="NEW")}
+            {sync_business.format(row="OLD")}
+            {sync_business.format(row="NEW")}
+        END
+    """)
+
+    if created:
+        # One-time backfill from reviews written before the aggregates existed
+        conn.execute("""
+            INSERT INTO business_rating_stats (business_id, rating_sum, review_count, stars_1, stars_2, stars_3, stars_4, stars_5)
+            SELECT business_id, SUM(rating), COUNT(*),
+                   SUM(rating = 1), SUM(rating = 2), SUM(rating = 3), SUM(rating = 4), SUM(rating = 5)
+            FROM reviews
+            GROUP BY business_id
+        """)
+
+PRICE_ROLLUPS = {
+    # table: SQL expression for the bucket an event's recorded_at falls in
+    "price_history_daily": "date({row}.recorded_at)",
+    # Weeks start on Monday
+    "price_history_weekly": "date({row}.recorded_at, 'weekday 0', '-6 days')",
+}
+
+def init_price_history(conn) -> None:
+    """Create the append-only price_events log and its daily/weekly rollups.
+
+    Every change to service_pricing.current_price appends an event, and each
+    event is folded into the rollups by triggers in the same transaction, so
+    long history ranges are served from rollups without touching the events.
+    """
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_events'"
+    ).fetchone() is None
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS price_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            business_id INTEGER NOT NULL,
+            service_name TEXT NOT NULL,
+            price REAL NOT NULL,
+            recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_price_events_business_recorded ON price_events (business_id, recorded_at)")
+    
+    for table, bucket in PRICE_ROLLUPS.items():
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                business_id INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                service_name TEXT NOT NULL,
+                open_price REAL NOT NULL,
+                close_price REAL NOT NULL,
+                min_price REAL NOT NULL,
+                max_price REAL NOT NULL,
+                price_sum REAL NOT NULL,
+                event_count INTEGER NOT NULL,
+                PRIMARY KEY (business_id, bucket, service_name)
+            )
+        """)
+        # Events arrive in recorded_at order, so the latest one closes the bucket
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup AFTER INSERT ON price_events
+            BEGIN
+                INSERT INTO {table} (business_id, bucket, service_name, open_price, close_price, min_price, max_price, price_sum, event_count)
+                VALUES (NEW.business_id, {bucket.format(row="NEW")}, NEW.service_name, NEW.price, NEW.price, NEW.price, NEW.price, NEW.price, 1)
+                ON CONFLICT (business_id, bucket, service_name) DO UPDATE SET
+                    close_price = excluded.close_price,
+                    min_price = MIN(min_price, excluded.min_price),
+                    max_price = MAX(max_price, excluded.max_price),
+                    price_sum = price_sum + excluded.price_sum,
+                    event_count = event_count + 1;
+            END
+        """)
+    
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_service_pricing_event_insert AFTER INSERT ON service_pricing
+        WHEN NEW.current_price IS NOT NULL
+        BEGIN
+            INSERT INTO price_events (business_id, service_name, price) VALUES (NEW.business_id, NEW.service_name, NEW.current_price);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_service_pricing_event_update AFTER UPDATE OF current_price ON service_pricing
+        WHEN NEW.current_price IS NOT NULL AND NEW.current_price IS NOT OLD.current_price
+        BEGIN
+            INSERT INTO price_events (business_id, service_name, price) VALUES (NEW.business_id, NEW.service_name, NEW.current_price);
+        END
+    """)
+    
+    if created:
+        # Seed the log with the prices that were current before it existed
+        conn.execute("""
+            INSERT INTO price_events (business_id, service_name, price, recorded_at)
+            SELECT business_id, service_name, current_price, COALESCE(last_updated, CURRENT_TIMESTAMP)
+            FROM service_pricing
+            WHERE current_price IS NOT NULL
+            ORDER BY last_updated, id
+        """)
+
+# Trailing address parts that name the country rather than a city or district (normalized)
+COUNTRY_NAMES = {"georgia", "sakartvelo"}
+
+# Shortest all-digit token read as a postcode ("0179 Tbilisi"); shorter ones are house numbers
+POSTCODE_DIGITS = 4
+
+def location_area(address):
+    """City or district of a free-text address, e.g. "456 Luxury Street, Tbilisi, Georgia" -> "Tbilisi".
+
+    Taken from the last comma-separated part that is not the country or a
+    postcode. None when that part is a street: it carries a house number, or
+    it is the first part of the address and has any number in it, so
+    "456 Luxury Street" alone has no area.
+    """
+    parts = (address or "").split(",")
+    for index in range(len(parts) - 1, -1, -1):
+        words = parts[index].split()
+        if index > 0:
+            # The first part is the street, so its numbers are never postcodes
+            words = [word for word in words if not (word.isdigit() and len(word) >= POSTCODE_DIGITS)]
+        area = " ".join(words)
+        if not area or normalize_text(area) in COUNTRY_NAMES:
+            continue
+        return None if any(ch.isdigit() for ch in area) else area
+    return None
+
+def init_dimensions(conn) -> None:
+    """Create the categories and locations dimension tables and point businesses at them.
+
+    Businesses keep their free-text category and location; category_id and
+    location_id are resolved by assign_dimensions(), and a trigger clears
+    category_id whenever either text changes so the row is resolved again.
+    Dimension rows are keyed by normalized name, so "Tbilisi", "TBILISI"
+    and "თბილისი" are one location, shown under the first spelling seen.
+    """
+    for table in ("categories", "locations"):
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                name_norm TEXT NOT NULL
+            )
+        """)
+        conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_name_norm ON {table} (name_norm)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_businesses_category_id ON businesses (category_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_businesses_location_id ON businesses (location_id)")
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_businesses_dimensions_update
+        AFTER UPDATE OF category, location ON businesses
+        BEGIN
+            UPDATE businesses SET category_id = NULL WHERE id = NEW.id;
+        END
+    """)
+    # Rows resolved under older location_area() rules are resolved again
+    stale_locations = []
+    for location, name_norm in conn.execute("""
+        SELECT DISTINCT b.location, l.name_norm
+        FROM businesses b
+        LEFT JOIN locations l ON l.id = b.location_id
+        WHERE b.category_id IS NOT NULL
+    """).fetchall():
+        area = location_area(location)
+        if (normalize_text(area) if area else None) != name_norm:
+            stale_locations.append((location,))
+    conn.executemany("UPDATE businesses SET category_id = NULL WHERE location = ?", stale_locations)
+    # Backfills existing rows, and any written by tools that skip assign_dimensions()
+    assign_dimensions(conn)
+    market_columns = {row[1] for row in conn.execute("PRAGMA table_info(market_price_stats)")}
+    if stale_locations and "location_id" in market_columns:
+        # Those businesses moved to other markets
+        from market_stats import rebuild_market_stats
+        rebuild_market_stats(conn)
+
+def assign_dimensions(conn) -> int:
+    """Resolve category_id/location_id for businesses that have none yet; returns how many"""
+    rows = conn.execute(
+        "SELECT id, category, location FROM businesses WHERE category_id IS NULL ORDER BY id"
+    ).fetchall()
+    if not rows:
+        return 0
+    resolved = [(row[0], (row[1] or "").strip(), location_area(row[2])) for row in rows]
+    # The oldest business's spelling names a new dimension row
+    categories, areas = {}, {}
+    for _, category, area in resolved:
+        categories.setdefault(normalize_text(category), category)
+        if area:
+            areas.setdefault(normalize_text(area), area)
+    conn.executemany(
+        "INSERT OR IGNORE INTO categories (name_norm, name) VALUES (?, ?)", categories.items()
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO locations (name_norm, name) VALUES (?, ?)", areas.items()
+    )
+    conn.executemany(
+        """
+        UPDATE businesses SET
+            category_id = (SELECT id FROM categories WHERE name_norm = ?),
+            location_id = (SELECT id FROM locations WHERE name_norm = ?)
+        WHERE id = ?
+        """,
+        [(normalize_text(category), normalize_text(area) if area else None, business_id)
+         for business_id, category, area in resolved]
+    )
+    return len(rows)
+
+def dimension_ids(conn, table, names):
+    """Ids of the named categories or locations (by normalized name); unknown names are skipped"""
+    names = [normalize_text(name.strip()) for name in names if name and name.strip()]
+    if not names:
+        return []
+    placeholders = ",".join(["?" for _ in names])
+    return [row[0] for row in conn.execute(f"SELECT id FROM {table} WHERE name_norm IN ({placeholders})", names)]
+
+def dimension_names(conn, table, ids):
+    """Names of categories or locations by id, in name order"""
+    ids = [int(i) for i in ids]
+    if not ids:
+        return []
+    placeholders = ",".join(["?" for _ in ids])
+    return [row[0] for row in conn.execute(f"SELECT name FROM {table} WHERE id IN ({placeholders}) ORDER BY name", ids)]
+
+# Normalized shadow column: the businesses column it mirrors
+NORMALIZED_COLUMNS = {
+    "name_norm": "name",
+    "description_norm": "description",
+    "category_norm": "category",
+    "location_norm": "location",
+}
+
+# Shortest term the trigram index can look up; shorter terms scan the shadow columns
+TRIGRAM_MIN_LENGTH = 3
+
+def init_normalized_text(conn) -> None:
+    """Index the normalized shadow columns search matches against (see text_normalize.py).
+
+    normalize_businesses() fills them in; a trigger clears name_norm when any
+    mirrored column changes, which marks the row for normalizing again.
+    Substring search runs against businesses_fts, an external-content FTS5
+    trigram index over the shadow columns that triggers keep in step.
+    """
+    # Finds the rows normalize_businesses() still has to fill in
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_businesses_name_norm ON businesses (name_norm)")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_businesses_normalized_update
+        AFTER UPDATE OF {", ".join(NORMALIZED_COLUMNS.values())} ON businesses
+        BEGIN
+            UPDATE businesses SET name_norm = NULL WHERE id = NEW.id;
+        END
+    """)
+
+    created = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'businesses_fts'"
+    ).fetchone() is None
+    columns = ", ".join(NORMALIZED_COLUMNS)
+    old_values = ", ".join(f"OLD.{column}" for column in NORMALIZED_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in NORMALIZED_COLUMNS)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS businesses_fts
+        USING fts5({columns}, content='businesses', content_rowid='id', tokenize='trigram')
+    """)
+    if created:
+        # Index existing rows before the triggers below start deleting old entries from it
+        normalize_businesses(conn)
+        conn.execute("INSERT INTO businesses_fts (businesses_fts) VALUES ('rebuild')")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_businesses_fts_insert AFTER INSERT ON businesses
+        BEGIN
+            INSERT INTO businesses_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_businesses_fts_delete AFTER DELETE ON businesses
+        BEGIN
+            INSERT INTO businesses_fts (businesses_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_businesses_fts_update AFTER UPDATE OF {columns} ON businesses
+        BEGIN
+            INSERT INTO businesses_fts (businesses_fts, rowid, {columns}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO businesses_fts (rowid, {columns}) VALUES (NEW.id, {new_values});
+        END
+    """)
+
+    # Backfills rows written by tools that skip normalize_businesses()
+    normalize_businesses(conn)
+
+def text_match_condition(term, columns=tuple(NORMALIZED_COLUMNS)):
+    """SQL condition (and params) matching businesses b whose normalized columns contain term.
+
+    term must already be normalized. Terms of TRIGRAM_MIN_LENGTH or more are
+    looked up in businesses_fts; shorter ones have no trigram and scan.
+    """
+    if len(term) >= TRIGRAM_MIN_LENGTH:
+        phrase = '"' + term.replace('"', '""') + '"'
+        if len(columns) < len(NORMALIZED_COLUMNS):
+            phrase = "{" + " ".join(columns) + "} : " + phrase
+        return "b.id IN (SELECT rowid FROM businesses_fts WHERE businesses_fts MATCH ?)", [phrase]
+    return "(" + " OR ".join(f"b.{column} LIKE ?" for column in columns) + ")", [f"%{term}%"] * len(columns)
+
+def prefix_range(term):
+    """(low, high) bounds of the normalized values that start with term, for an index range seek"""
+    return term, term + "\U0010ffff"
+
+def normalize_businesses(conn) -> int:
+    """Fill the normalized columns of businesses that have none yet; returns how many"""
+    rows = conn.execute(
+        f"SELECT id, {', '.join(NORMALIZED_COLUMNS.values())} FROM businesses WHERE name_norm IS NULL"
+    ).fetchall()
+    conn.executemany(
+        f"UPDATE businesses SET {', '.join(f'{column} = ?' for column in NORMALIZED_COLUMNS)} WHERE id = ?",
+        [[normalize_text(value) for value in row[1:]] + [row[0]] for row in rows]
+    )
+    return len(rows)
+
+# Revision column: the businesses columns whose changes bump it
+REVISION_COLUMNS = {
+    # Text indexes (similar_index.py, semantic_index.py)
+    "text_revision": ["name", "category", "description", "services"],
+    # Columnar search snapshot (search_snapshot.py); rating and total_reviews
+    # are rewritten by the review stats triggers
+    "search_revision": ["name", "category_id", "location_id", "latitude", "longitude", "rating", "total_reviews"],
+}
+
+def init_revisions(conn) -> None:
+    """Stamp businesses with increasing revisions whenever indexed columns change.
+
+    Process-local indexes poll for rows above the last revision they saw, so
+    writes from any code path or process reach them. A deleted business
+    leaves its id in deleted_businesses with one more revision per column,
+    so the indexes drop it too, and revisions never step back after the
+    business holding the highest one is deleted.
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS deleted_businesses (
+            id INTEGER PRIMARY KEY,
+            {", ".join(f"{column} INTEGER NOT NULL" for column in REVISION_COLUMNS)}
+        )
+    """)
+
+    def next_revision(column, *floors):
+        return (
+            f"MAX(COALESCE((SELECT MAX({column}) FROM businesses), 0), "
+            f"COALESCE((SELECT MAX({column}) FROM deleted_businesses), 0){''.join(', ' + floor for floor in floors)}) + 1"
+        )
+
+    for column, watched in REVISION_COLUMNS.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_businesses_{column} ON businesses ({column})")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_deleted_businesses_{column} ON deleted_businesses ({column})")
+        bump_revision = f"""
+            UPDATE businesses SET {column} = {next_revision(column)}
+            WHERE id = NEW.id;
+        """
+        # Recreated so changes to the watched columns or the bump reach existing databases
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_businesses_{column}_insert")
+        conn.execute(f"""
+            CREATE TRIGGER trg_businesses_{column}_insert AFTER INSERT ON businesses
+            BEGIN
+                {bump_revision}
+            END
+        """)
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_businesses_{column}_update")
+        conn.execute(f"""
+            CREATE TRIGGER trg_businesses_{column}_update
+            AFTER UPDATE OF {", ".join(watched)} ON businesses
+            BEGIN
+                {bump_revision}
+            END
+        """)
+    conn.execute("DROP TRIGGER IF EXISTS trg_businesses_revisions_delete")
+    conn.execute(f"""
+        CREATE TRIGGER trg_businesses_revisions_delete AFTER DELETE ON businesses
+        BEGIN
+            INSERT OR REPLACE INTO deleted_businesses (id, {", ".join(REVISION_COLUMNS)})
+            VALUES (OLD.id, {", ".join(next_revision(column, f"OLD.{column}") for column in REVISION_COLUMNS)});
+        END
+    """)
+
+def service_pricing_rows(business_id, service_pricing):
+    """Build service_pricing rows from the {service_name: {current_price, ...}} payload"""
+    rows = []
+    for service_name, pricing_data in service_pricing.items():
+        current_price = pricing_data.get("current_price", 0)
+        rows.append((
+            business_id,
+            service_name,
+            current_price,
+            pricing_data.get("recommended_price", current_price),
+            pricing_data.get("pricing_strategy", "competitive"),
+            pricing_data.get("confidence_score", 0.8)
+        ))
+    return rows
+
+def business_hours_rows(business_id, hours):
+    """Build business_hours rows from the [{day_of_week, open_time, ...}] payload.
+
+    Invalid days are skipped; if a day appears twice the last entry wins.
+    """
+    rows = {}
+    for hour in hours:
+        day_of_week = hour.get("day_of_week")
+        if day_of_week is not None and 0 <= day_of_week <= 6:
+            rows[day_of_week] = (
+                business_id,
+                day_of_week,
+                hour.get("open_time"),
+                hour.get("close_time"),
+                bool(hour.get("is_closed", False))
+            )
+    return [rows[day] for day in sorted(rows)]
+
+def parse_clock(value):
+    """'HH:MM' -> minutes after midnight, or None if unparseable"""
+    try:
+        hours, minutes = str(value).split(":")[:2]
+        hours, minutes = int(hours), int(minutes)
+    except (TypeError, ValueError):
+        return None
+    if 0 <= hours <= 24 and 0 <= minutes < 60 and hours * 60 + minutes <= MINUTES_PER_DAY:
+        return hours * 60 + minutes
+    return None
+
+def open_interval_rows(hours_rows):
+    """Turn business_hours rows into (business_id, day_of_week, start_minute, end_minute)
+    minute-of-week intervals (0 = Sunday 00:00). Overnight hours run into the next day and
+    Saturday-night hours that cross the week boundary are split in two."""
+    intervals = []
+    for business_id, day_of_week, open_time, close_time, is_closed in hours_rows:
+        open_minute, close_minute = parse_clock(open_time), parse_clock(close_time)
+        if is_closed or open_minute is None or close_minute is None:
+            continue
+        if close_minute <= open_minute:
+            close_minute += MINUTES_PER_DAY
+        start = day_of_week * MINUTES_PER_DAY + open_minute
+        end = day_of_week * MINUTES_PER_DAY + close_minute
+        if end > MINUTES_PER_WEEK:
+            intervals.append((business_id, day_of_week, start, MINUTES_PER_WEEK))
+            intervals.append((business_id, day_of_week, 0, end - MINUTES_PER_WEEK))
+        else:
+            intervals.append((business_id, day_of_week, start, end))
+    return intervals
+
+def upsert_business_hours(conn, business_id, hours_rows):
+    """Make a business's hours match hours_rows, writing only the days that changed"""
+    existing = {
+        row[0]: (row[1], row[2], bool(row[3]))
+        for row in conn.execute(
+            "SELECT day_of_week, open_time, close_time, is_closed FROM business_hours WHERE business_id = ?",
+            (business_id,)
+        )
+    }
+    desired = {row[1]: (row[2], row[3], bool(row[4])) for row in hours_rows}
+
+    removed_days = [day for day in existing if day not in desired]
+    changed_rows = [row for row in hours_rows if existing.get(row[1]) != desired[row[1]]]
+    stale_days = removed_days + [row[1] for row in changed_rows]
+    if not stale_days:
+        return 0
+
+    placeholders = ",".join(["?" for _ in stale_days])
+    conn.execute(
+        f"DELETE FROM business_open_intervals WHERE business_id = ? AND day_of_week IN ({placeholders})",
+        [business_id] + stale_days
+    )
+    if removed_days:
+        placeholders = ",".join(["?" for _ in removed_days])
+        conn.execute(
+            f"DELETE FROM business_hours WHERE business_id = ? AND day_of_week IN ({placeholders})",
+            [business_id] + removed_days
+        )
+    conn.executemany(
+        """
+        INSERT INTO business_hours (business_id, day_of_week, open_time, close_time, is_closed) VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (business_id, day_of_week) DO UPDATE SET
+            open_time = excluded.open_time,
+            close_time = excluded.close_time,
+            is_closed = excluded.is_closed
+        """,
+        changed_rows
+    )
+    _insert_open_intervals(conn, open_interval_rows(changed_rows))
+    return len(stale_days)
+
+def _insert_open_intervals(conn, interval_rows):
+    if interval_rows:
+        conn.executemany(
+            "INSERT INTO business_open_intervals (business_id, day_of_week, start_minute, end_minute) VALUES (?, ?, ?, ?)",
+            interval_rows
+        )
+
+def insert_business_children(conn, pricing_rows, hours_rows) -> None:
+    """Insert prepared service_pricing and business_hours rows (plus the hours'
+    open intervals) with one executemany each"""
+    if pricing_rows:
+        conn.executemany(
+            """
+            INSERT INTO service_pricing (business_id, service_name, current_price, recommended_price, pricing_strategy, confidence_score)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            pricing_rows
+        )
+    if hours_rows:
+        conn.executemany(
+            "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time, is_closed) VALUES (?, ?, ?, ?, ?)",
+            hours_rows
+        )
+        _insert_open_intervals(conn, open_interval_rows(hours_rows))
+
 def get_db():
     """Return a SQLite connection with dict-like row factory"""
     conn = sqlite3.connect(DB_PATH)
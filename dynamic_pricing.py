@@ -0,0 +1,181 @@
+"""
+Compiled dynamic pricing schedules.
+
+A business's dynamic_pricing_config is compiled once, when it is posted,
+into one row per service in dynamic_price_schedules: a 168-slot
+hour-of-week price table (slot 0 is Sunday 00:00, matching
+business_hours.day_of_week) and 12 monthly seasonal multipliers, both
+packed as little-endian float32 blobs. Quoting a price is then a single
+indexed read plus a multiply and a clamp; the JSON config is never
+re-parsed on the read path.
+"""
+
+import struct
+
+HOURS_PER_WEEK = 7 * 24
+WEEKEND_DAYS = (0, 6)
+DEFAULT_PEAK_HOURS = range(17, 21)
+DEFAULT_OFF_PEAK_HOURS = range(6, 11)
+
+# Months (1-12) each seasonal adjustment applies to; holidays win over winter in December
+SEASON_MONTHS = {
+    "winter": (1, 2, 12),
+    "summer": (6, 7, 8),
+    "holidays": (12,),
+}
+
+MULTIPLIER_FIELDS = [
+    "base_price_adjustment",
+    "demand_multiplier",
+    "peak_hours_multiplier",
+    "off_peak_multiplier",
+    "weekend_multiplier",
+]
+
+def _pack(values):
+    return struct.pack(f"<{len(values)}f", *values)
+
+def _unpack_one(blob):
+    return struct.unpack("<f", blob)[0]
+
+def validate_config(config):
+    """Return an error message for an invalid config, or None"""
+    if not isinstance(config, dict):
+        return "Config must be a JSON object"
+    for field in MULTIPLIER_FIELDS:
+        value = config.get(field)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            return f"{field} must be a positive number"
+
+    seasonal = config.get("seasonal_adjustments") or {}
+    if not isinstance(seasonal, dict):
+        return "seasonal_adjustments must be an object"
+    for season, value in seasonal.items():
+        if season not in SEASON_MONTHS:
+            return f"Unknown season: {season}"
+        if not isinstance(value, (int, float)) or value <= 0:
+            return f"seasonal_adjustments.{season} must be a positive number"
+
+    for field in ("peak_hours", "off_peak_hours"):
+        hours = config.get(field)
+        if hours is not None and not (
+            isinstance(hours, list) and all(isinstance(h, int) and 0 <= h <= 23 for h in hours)
+        ):
+            return f"{field} must be a list of hours between 0 and 23"
+
+    min_price, max_price = config.get("min_price") or 0, config.get("max_price") or 0
+    if not isinstance(min_price, (int, float)) or not isinstance(max_price, (int, float)):
+        return "min_price and max_price must be numbers"
+    if min_price < 0 or max_price < 0 or (max_price and min_price > max_price):
+        return "min_price must be between 0 and max_price"
+    return None
+
+def is_enabled(config):
+    """Whether a config applies dynamic prices; a config without "enabled" does not"""
+    return bool(config.get("enabled"))
+
+def weekly_multipliers(config):
+    """168 hour-of-week price multipliers for a config"""
+    base = config.get("base_price_adjustment") or 1.0
+    # Older configs only carry demand_multiplier for the busy hours
+    peak = config.get("peak_hours_multiplier") or config.get("demand_multiplier") or 1.0
+    off_peak = config.get("off_peak_multiplier") or 1.0
+    weekend = config.get("weekend_multiplier") or 1.0
+    peak_hours = set(config.get("peak_hours") or DEFAULT_PEAK_HOURS)
+    off_peak_hours = set(config.get("off_peak_hours") or DEFAULT_OFF_PEAK_HOURS) - peak_hours
+
+    multipliers = []
+    for slot in range(HOURS_PER_WEEK):
+        day_of_week, hour = divmod(slot, 24)
+        multiplier = base
+        if day_of_week in WEEKEND_DAYS:
+            multiplier *= weekend
+        if hour in peak_hours:
+            multiplier *= peak
+        elif hour in off_peak_hours:
+            multiplier *= off_peak
+        multipliers.append(multiplier)
+    return multipliers
+
+def monthly_multipliers(config):
+    """12 seasonal multipliers, index 0 is January"""
+    seasonal = config.get("seasonal_adjustments") or {}
+    multipliers = [1.0] * 12
+    for season in ("winter", "summer", "holidays"):
+        if seasonal.get(season):
+            for month in SEASON_MONTHS[season]:
+                multipliers[month - 1] = seasonal[season]
+    return multipliers
+
+def compile_schedules(conn, business_id, config):
+    """Replace a business's compiled schedules; runs inside the caller's transaction.
+
+    A disabled config leaves no schedules, so quotes fall back to current_price.
+    Returns the number of services compiled.
+    """
+    conn.execute("DELETE FROM dynamic_price_schedules WHERE business_id = ?", (business_id,))
+    if not is_enabled(config):
+        return 0
+
+    weekly = weekly_multipliers(config)
+    seasonal = _pack(monthly_multipliers(config))
+    rows = [
+        (business_id, service_name, _pack([price * m for m in weekly]), seasonal,
+         config.get("min_price") or None, config.get("max_price") or None)
+        for service_name, price in conn.execute(
+            "SELECT service_name, current_price FROM service_pricing WHERE business_id = ? AND current_price IS NOT NULL",
+            (business_id,)
+        )
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO dynamic_price_schedules
+            (business_id, service_name, weekly_prices, monthly_multipliers, min_price, max_price)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        rows
+    )
+    return len(rows)
+
+def quote(conn, business_id, hour_of_week, month, service_names=None):
+    """Price a business's services (all of them by default) at an hour of the week and month.
+
+    Each price is one slot read out of the compiled blobs with substr(), so
+    only 8 bytes per service leave SQLite. Services without a schedule are
+    quoted at their current_price.
+    """
+    conditions, params = ["sp.business_id = ?"], [4 * hour_of_week + 1, 4 * (month - 1) + 1, business_id]
+    if service_names:
+        conditions.append(f"sp.service_name IN ({','.join(['?' for _ in service_names])})")
+        params.extend(service_names)
+
+    rows = conn.execute(
+        f"""
+        SELECT sp.service_name, sp.current_price,
+               substr(s.weekly_prices, ?, 4), substr(s.monthly_multipliers, ?, 4),
+               s.min_price, s.max_price
+        FROM service_pricing sp
+        LEFT JOIN dynamic_price_schedules s
+            ON s.business_id = sp.business_id AND s.service_name = sp.service_name
+        WHERE {' AND '.join(conditions)}
+        ORDER BY sp.service_name
+        """,
+        params
+    ).fetchall()
+
+    quotes = []
+    for service_name, base_price, weekly_slot, seasonal_slot, min_price, max_price in rows:
+        price = base_price
+        if weekly_slot is not None:
+            price = _unpack_one(weekly_slot) * _unpack_one(seasonal_slot)
+            if min_price is not None:
+                price = max(price, min_price)
+            if max_price is not None:
+                price = min(price, max_price)
+        quotes.append({
+            "service_name": service_name,
+            "base_price": base_price,
+            "price": round(price, 2) if price is not None else None,
+            "dynamic": weekly_slot is not None
+        })
+    return quotes
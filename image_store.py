@@ -0,0 +1,194 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+UPLOAD_FOLDER = "uploads"
+UPLOAD_URL_PREFIX = "/uploads/"
+CHUNK_SIZE = 64 * 1024
+TEMP_PREFIX = ".upload-"
+
+# Leading bytes of each accepted image format, mapped to the extension its blobs are stored under
+IMAGE_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+]
+
+_BLOB_PATH_RE = re.compile(r"^([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})\.[a-z0-9]+$")
+
+def blob_path(digest, ext):
+    """Sharded relative path for a blob, e.g. ab/cd/abcd....jpg"""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+def sniff_extension(path):
+    """Extension for the image format of a stored file, from its content; None if it isn't one we accept"""
+    with open(path, "rb") as f:
+        head = f.read(12)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, ext in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    return None
+
+def digest_from_path(relpath):
+    """Return the digest if relpath is a content-addressed blob, else None (legacy uploads)"""
+    match = _BLOB_PATH_RE.match(relpath)
+    return match.group(3) if match else None
+
+def url_for_blob(relpath):
+    return f"{UPLOAD_URL_PREFIX}{relpath}"
+
+def path_from_url(image_url):
+    """Map an image_url back to a file inside UPLOAD_FOLDER, or None if it escapes it"""
+    if not image_url or not image_url.startswith(UPLOAD_URL_PREFIX):
+        return None
+    relpath = os.path.normpath(image_url[len(UPLOAD_URL_PREFIX):])
+    if relpath.startswith("..") or os.path.isabs(relpath):
+        return None
+    return os.path.join(UPLOAD_FOLDER, relpath)
+
+def hash_to_temp(stream):
+    """Copy an upload stream to a temp file while hashing it; returns (sha256 hex, temp path)"""
+    hasher = hashlib.sha256()
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_FOLDER, prefix=TEMP_PREFIX, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                out.write(chunk)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return hasher.hexdigest(), tmp_path
+
+def place_blob(tmp_path, relpath):
+    """Move a hashed temp file into place, or drop it if identical content is already stored"""
+    dest = os.path.join(UPLOAD_FOLDER, relpath)
+    if os.path.exists(dest):
+        os.remove(tmp_path)
+        return dest
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    os.replace(tmp_path, dest)
+    return dest
+
+def release_blob(conn, image_url):
+    """Unlink the file behind image_url once no gallery image or business cover references it.
+
+    Must run inside the same write transaction as the DELETE so a concurrent
+    upload of the same content cannot re-reference the file in between.
+    """
+    still_used = conn.execute(
+        """
+        SELECT 1 FROM business_images WHERE image_url = ?
+        UNION ALL
+        SELECT 1 FROM businesses WHERE image_url = ?
+        LIMIT 1
+        """,
+        (image_url, image_url)
+    ).fetchone()
+    if still_used:
+        return False
+    filepath = path_from_url(image_url)
+    if filepath and os.path.exists(filepath):
+        os.remove(filepath)
+        return True
+    return False
+
+def iter_stored_files(root=UPLOAD_FOLDER):
+    """Yield os.DirEntry objects for every file under root, one directory at a time"""
+    pending_dirs = [root]
+    while pending_dirs:
+        directory = pending_dirs.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending_dirs.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def delete_orphan_files(conn, batch_size=500, temp_grace_seconds=3600, dry_run=False):
+    """Remove stored files that no business_images row or business cover (image_url) references.
+
+    The upload folder is walked lazily and checked against the table one
+    batch at a time, so neither side is ever loaded in full. Each batch is
+    re-checked and deleted under the write lock, the same lock uploads hold
+    while placing a blob and inserting its row.
+    """
+    stats = {"scanned": 0, "orphans": 0, "stale_temp": 0, "bytes_freed": 0}
+    now = time.time()
+
+    for batch in _batched(iter_stored_files(), batch_size):
+        stats["scanned"] += len(batch)
+        candidates = {}
+        for entry in batch:
+            if entry.name.startswith(TEMP_PREFIX):
+                # Abandoned partial upload
+                stat = entry.stat()
+                if now - stat.st_mtime > temp_grace_seconds:
+                    stats["stale_temp"] += 1
+                    stats["bytes_freed"] += stat.st_size
+                    if not dry_run:
+                        os.remove(entry.path)
+                continue
+            relpath = os.path.relpath(entry.path, UPLOAD_FOLDER).replace(os.sep, "/")
+            candidates[url_for_blob(relpath)] = entry
+        if not candidates:
+            continue
+
+        if not dry_run:
+            conn.execute("BEGIN IMMEDIATE")
+        placeholders = ",".join(["?" for _ in candidates])
+        referenced = {
+            row[0] for row in conn.execute(
+                f"""
+                SELECT image_url FROM business_images WHERE image_url IN ({placeholders})
+                UNION
+                SELECT image_url FROM businesses WHERE image_url IN ({placeholders})
+                """,
+                list(candidates) * 2
+            )
+        }
+        for image_url, entry in candidates.items():
+            if image_url in referenced:
+                continue
+            stats["orphans"] += 1
+            stats["bytes_freed"] += entry.stat().st_size
+            if not dry_run:
+                os.remove(entry.path)
+        if not dry_run:
+            conn.commit()
+
+    return stats
+
+def iter_dangling_references(conn, batch_size=500):
+    """Yield business_images rows whose file is missing, paging through the table by id"""
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, business_id, image_url FROM business_images WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size)
+        ).fetchall()
+        if not rows:
+            return
+        for row in rows:
+            filepath = path_from_url(row[2])
+            if filepath is None or not os.path.isfile(filepath):
+                yield row
+        last_id = rows[-1][0]
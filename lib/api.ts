@@ -19,6 +19,7 @@ export interface Review {
 
 export interface ReviewsResponse {
   reviews: Review[];
+  next_cursor: string | null;
   pagination: {
     page: number;
     limit: number;
@@ -27,10 +28,22 @@ export interface ReviewsResponse {
   };
 }
 
+// Keyset-paged reviews (?cursor=): follow next_cursor instead of page numbers
+export interface ReviewsCursorResponse {
+  reviews: Review[];
+  next_cursor: string | null;
+  pagination: {
+    limit: number;
+    total: number;
+    pages: number;
+  };
+}
+
 export interface AverageRatingResponse {
   averageRating: number;
   totalReviews: number;
   businessId: number;
+  distribution?: Record<'1' | '2' | '3' | '4' | '5', number>;
 }
 
 // AI Recommendations types
@@ -65,7 +78,10 @@ export interface SearchFilters {
   location?: string[];
   minRating?: number;
   maxRating?: number;
-  sortBy?: 'name' | 'rating' | 'recent' | 'distance';
+  openNow?: boolean;
+  openAt?: string;
+  mode?: 'keyword' | 'semantic' | 'hybrid';
+  sortBy?: 'name' | 'rating' | 'recent' | 'distance' | 'relevance';
   sortOrder?: 'asc' | 'desc';
   page?: number;
   limit?: number;
@@ -156,6 +172,13 @@ export const reviewsApi = {
     return response.json();
   },
 
+  async getBusinessReviewsAfter(businessId: number, cursor = "", limit = 10): Promise<ReviewsCursorResponse> {
+    const params = new URLSearchParams({ cursor, limit: limit.toString() });
+    const response = await fetch(`${API_BASE}/reviews/${businessId}?${params.toString()}`);
+    if (!response.ok) throw new Error("Failed to fetch reviews");
+    return response.json();
+  },
+
   async getBusinessAverageRating(businessId: number): Promise<AverageRatingResponse> {
     const response = await fetch(`${API_BASE}/reviews/average/${businessId}`);
     if (!response.ok) throw new Error("Failed to fetch average rating");
@@ -262,24 +285,35 @@ export interface DynamicPricingConfig {
   update_frequency: string;
 }
 
+export type PriceHistoryResolution = 'auto' | 'raw' | 'day' | 'week';
+
 export interface PriceHistoryEntry {
   date: string;
+  service_name: string;
   price: number;
-  demand: number;
-  revenue: number;
+  open?: number;
+  close?: number;
+  min?: number;
+  max?: number;
+  changes?: number;
+  demand: number | null;
+  revenue: number | null;
 }
 
 export interface PriceTrends {
   price_trend: string;
-  revenue_trend: string;
+  revenue_trend: string | null;
   price_volatility: number;
-  optimal_price_range: string;
-  revenue_optimization: string;
+  optimal_price_range: string | null;
+  revenue_optimization: string | null;
 }
 
 export interface PriceHistoryResponse {
   business_name: string;
   category: string;
+  resolution: Exclude<PriceHistoryResolution, 'auto'>;
+  from: string;
+  to: string;
   price_history: PriceHistoryEntry[];
   trends: PriceTrends;
 }
@@ -298,11 +332,23 @@ export interface MarketAverage {
   market_position: string;
 }
 
+export interface MarketServiceStats {
+  service_name: string;
+  count: number;
+  mean: number;
+  p25: number;
+  median: number;
+  p75: number;
+  min: number;
+  max: number;
+}
+
 export interface PriceComparisonResponse {
   category: string;
   location: string;
   comparison_data: PriceComparisonData[];
   market_average: MarketAverage;
+  service_stats?: MarketServiceStats[];
   business_context?: {
     business_name: string;
     business_rating: number;
@@ -319,6 +365,46 @@ export interface PriceComparisonResponse {
   };
 }
 
+export interface PriceQuote {
+  service_name: string;
+  base_price: number | null;
+  price: number | null;
+  dynamic: boolean;
+}
+
+export interface QuoteResponse {
+  business_id: number;
+  at: string;
+  quotes: PriceQuote[];
+  total: number;
+}
+
+export interface RevenueSummary {
+  mean: number;
+  p5: number;
+  p50: number;
+  p95: number;
+}
+
+export interface PricingSimulationResponse {
+  business_id: number;
+  start: string;
+  scenarios: number;
+  hours_simulated: number;
+  open_hours_per_week: number;
+  baseline: RevenueSummary;
+  candidate: RevenueSummary;
+  uplift: RevenueSummary & { percent: number; probability_positive: number };
+  services: {
+    service_name: string;
+    current_price: number;
+    market_median_price: number;
+    average_candidate_price: number;
+    baseline_revenue: number;
+    candidate_revenue: number;
+  }[];
+}
+
 export const pricingApi = {
   async getPricingAnalysis(businessId: number, token?: string): Promise<PricingAnalysisResponse> {
     if (!token) throw new Error("Authentication required");
@@ -356,8 +442,61 @@ export const pricingApi = {
     return response.json();
   },
 
-  async getPriceHistory(businessId: number): Promise<PriceHistoryResponse> {
-    const response = await fetch(`${API_BASE}/businesses/${businessId}/price-history`);
+  async simulatePricing(businessId: number, config?: Partial<DynamicPricingConfig>, token?: string, scenarios?: number): Promise<PricingSimulationResponse> {
+    if (!token) throw new Error("Authentication required");
+
+    const response = await fetch(`${API_BASE}/businesses/${businessId}/pricing-simulation`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "Authorization": `Bearer ${token}`,
+      },
+      body: JSON.stringify({ config, scenarios }),
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.error || "Failed to simulate pricing");
+    }
+
+    return response.json();
+  },
+
+  async getServicePrice(businessId: number, service: string, at?: string): Promise<PriceQuote & { at: string }> {
+    const params = new URLSearchParams({ service });
+    if (at) params.append('at', at);
+
+    const response = await fetch(`${API_BASE}/businesses/${businessId}/price?${params.toString()}`);
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.error || "Failed to get service price");
+    }
+    return response.json();
+  },
+
+  async quoteServices(businessId: number, services?: string[], at?: string): Promise<QuoteResponse> {
+    const response = await fetch(`${API_BASE}/businesses/${businessId}/quote`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ services, at }),
+    });
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.error || "Failed to quote services");
+    }
+    return response.json();
+  },
+
+  async getPriceHistory(
+    businessId: number,
+    options: { resolution?: PriceHistoryResolution; service?: string; from?: string; to?: string } = {}
+  ): Promise<PriceHistoryResponse> {
+    const params = new URLSearchParams();
+    Object.entries(options).forEach(([key, value]) => {
+      if (value) params.append(key, value);
+    });
+
+    const response = await fetch(`${API_BASE}/businesses/${businessId}/price-history?${params.toString()}`);
     if (!response.ok) {
       const error = await response.json();
       throw new Error(error.error || "Failed to get price history");
@@ -378,6 +517,46 @@ export const pricingApi = {
   },
 };
 
+export interface SimilarBusiness {
+  id: number;
+  name: string;
+  category: string;
+  location: string;
+  image_url: string;
+  rating: number | null;
+  total_reviews: number;
+  similarity: number;
+}
+
+export interface SimilarBusinessesResponse {
+  business_id: number;
+  similar: SimilarBusiness[];
+}
+
+export interface MapCluster {
+  count: number;
+  latitude: number;
+  longitude: number;
+  top_business: {
+    id: number;
+    name: string;
+    category: string;
+    location: string;
+    image_url: string;
+    rating: number | null;
+    total_reviews: number;
+    latitude: number;
+    longitude: number;
+  } | null;
+}
+
+export interface MapClustersResponse {
+  bbox: [number, number, number, number];
+  zoom: number;
+  total: number;
+  clusters: MapCluster[];
+}
+
 export const searchApi = {
   async searchBusinesses(filters: SearchFilters): Promise<SearchResponse> {
     const params = new URLSearchParams();
@@ -387,6 +566,9 @@ export const searchApi = {
     if (filters.location?.length) params.append('location', filters.location.join(','));
     if (filters.minRating) params.append('minRating', filters.minRating.toString());
     if (filters.maxRating) params.append('maxRating', filters.maxRating.toString());
+    if (filters.openNow) params.append('open_now', 'true');
+    if (filters.openAt) params.append('open_at', filters.openAt);
+    if (filters.mode) params.append('mode', filters.mode);
     if (filters.sortBy) params.append('sortBy', filters.sortBy);
     if (filters.sortOrder) params.append('sortOrder', filters.sortOrder);
     if (filters.page) params.append('page', filters.page.toString());
@@ -418,4 +600,16 @@ export const searchApi = {
     if (!response.ok) throw new Error("Failed to fetch filter options");
     return response.json();
   },
+
+  async getSimilarBusinesses(businessId: number, limit = 10): Promise<SimilarBusinessesResponse> {
+    const response = await fetch(`${API_BASE}/businesses/${businessId}/similar?limit=${limit}`);
+    if (!response.ok) throw new Error("Failed to fetch similar businesses");
+    return response.json();
+  },
+
+  async getMapClusters(bbox: [number, number, number, number], zoom: number): Promise<MapClustersResponse> {
+    const response = await fetch(`${API_BASE}/businesses/map?bbox=${bbox.join(',')}&zoom=${zoom}`);
+    if (!response.ok) throw new Error("Failed to fetch map clusters");
+    return response.json();
+  },
 };
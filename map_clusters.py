@@ -0,0 +1,109 @@
+"""
+Viewport clustering for the business map.
+
+Businesses with coordinates are binned into a Web Mercator grid per zoom
+level: each 256px map tile is split into 2 ** CELL_BITS cells per side.
+A cluster table per zoom (cell key, count, centroid and top business,
+sorted by key) is built once per search snapshot view from its lat/lng
+columns and reused until the next write. A viewport query is then a
+binary search over the key range of each grid column it covers, and at
+most MAX_CELLS cells are ever returned: a viewport that spans more cells
+than that is answered from the next coarser zoom.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+
+MAX_ZOOM = 20
+# 2 ** CELL_BITS cells per tile side, i.e. 64px cells on 256px tiles
+CELL_BITS = 2
+MAX_CELLS = 1024
+# Web Mercator stops at about +/-85.0511 degrees latitude
+MAX_LATITUDE = 85.05112878
+
+_tables = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+def grid_size(zoom):
+    return 1 << (zoom + CELL_BITS)
+
+def cell_x(longitude, size):
+    x = np.floor((np.asarray(longitude, dtype=np.float64) + 180.0) / 360.0 * size)
+    return np.clip(x, 0, size - 1).astype(np.int64)
+
+def cell_y(latitude, size):
+    lat = np.radians(np.clip(np.asarray(latitude, dtype=np.float64), -MAX_LATITUDE, MAX_LATITUDE))
+    y = np.floor((1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * size)
+    return np.clip(y, 0, size - 1).astype(np.int64)
+
+class ClusterTable:
+    """Per-cell aggregates of one zoom level, sorted by cell key (x major, then y)"""
+
+    def __init__(self, view, zoom):
+        self.zoom = zoom
+        self.size = grid_size(zoom)
+        latitude = view.columns["latitude"].astype(np.float64)
+        longitude = view.columns["longitude"].astype(np.float64)
+        placed = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+        latitude, longitude = latitude[placed], longitude[placed]
+        ids = view.columns["id"][placed]
+        keys = cell_x(longitude, self.size) * self.size + cell_y(latitude, self.size)
+
+        # Within a cell the last row is the top business: best rating, then most reviews, then lowest id
+        order = np.lexsort((-ids, view.columns["reviews"][placed], view.columns["rating"][placed], keys))
+        keys, latitude, longitude, ids = keys[order], latitude[order], longitude[order], ids[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.zeros(0, dtype=np.int64)
+        ends = np.r_[starts[1:], len(keys)].astype(np.int64)
+
+        self.keys = keys[starts]
+        self.counts = ends - starts
+        self.latitudes = np.add.reduceat(latitude, starts) / self.counts if len(starts) else np.zeros(0)
+        self.longitudes = np.add.reduceat(longitude, starts) / self.counts if len(starts) else np.zeros(0)
+        self.top_ids = ids[ends - 1]
+
+    def cells(self, x_ranges, y0, y1):
+        """Indexes of the cells with x in any of x_ranges ((first, last) pairs) and y0 <= y <= y1"""
+        columns = np.concatenate([np.arange(x0, x1 + 1, dtype=np.int64) for x0, x1 in x_ranges])
+        starts = np.searchsorted(self.keys, columns * self.size + y0)
+        ends = np.searchsorted(self.keys, columns * self.size + y1 + 1)
+        lengths = ends - starts
+        return np.repeat(ends - lengths.cumsum(), lengths) + np.arange(lengths.sum())
+
+def cluster_table(view, zoom):
+    """The (cached) cluster table of a search snapshot view at a zoom level"""
+    with _lock:
+        tables = _tables.setdefault(view, {})
+        if zoom not in tables:
+            tables[zoom] = ClusterTable(view, zoom)
+        return tables[zoom]
+
+def viewport_ranges(bbox, zoom):
+    """Grid x ranges and the y range a (west, south, east, north) box covers at a zoom"""
+    west, south, east, north = bbox
+    size = grid_size(zoom)
+    y0, y1 = int(cell_y(north, size)), int(cell_y(south, size))
+    if west <= east:
+        x_ranges = [(int(cell_x(west, size)), int(cell_x(east, size)))]
+    else:
+        # Crosses the antimeridian
+        x_ranges = [(int(cell_x(west, size)), size - 1), (0, int(cell_x(east, size)))]
+    return x_ranges, y0, y1
+
+def viewport_clusters(view, bbox, zoom):
+    """(zoom used, clusters) for a viewport; each cluster is (count, latitude, longitude, top business id)"""
+    zoom = min(max(zoom, 0), MAX_ZOOM)
+    while True:
+        x_ranges, y0, y1 = viewport_ranges(bbox, zoom)
+        covered = sum(x1 - x0 + 1 for x0, x1 in x_ranges) * (y1 - y0 + 1)
+        if covered <= MAX_CELLS or zoom == 0:
+            break
+        zoom -= 1
+
+    table = cluster_table(view, zoom)
+    cells = table.cells(x_ranges, y0, y1)
+    return zoom, [
+        (int(table.counts[i]), float(table.latitudes[i]), float(table.longitudes[i]), int(table.top_ids[i]))
+        for i in cells
+    ]
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Materialized per (category, location, service_name) price statistics.
+
+Groups are keyed by the categories/locations dimension ids, so a market
+is a category in a city or district rather than one street address;
+location_id 0 collects businesses whose address names no city.
+market_price_stats is refreshed for the affected keys whenever
+service_pricing (or a business's category/location) changes, and can be
+rebuilt in bulk with vectorized NumPy percentiles:
+
+    python market_stats.py --rebuild
+"""
+
+import argparse
+import sqlite3
+
+import numpy as np
+
+from db import DB_PATH
+
+QUANTILES = (0.25, 0.5, 0.75)
+
+def grouped_price_stats(group_codes, prices):
+    """Per-group count, mean, p25/p50/p75, min and max for flat (group, price) arrays.
+
+    Percentiles use linear interpolation between order statistics (NumPy's
+    default method), computed for every group at once from one lexsort.
+    """
+    group_codes = np.asarray(group_codes, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    order = np.lexsort((prices, group_codes))
+    sorted_prices = prices[order]
+
+    counts = np.bincount(group_codes)
+    present = np.flatnonzero(counts)
+    counts = counts[present]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    sums = np.bincount(group_codes, weights=prices)[present]
+
+    stats = {
+        "group": present,
+        "count": counts,
+        "mean": sums / counts,
+        "min": sorted_prices[starts],
+        "max": sorted_prices[starts + counts - 1],
+    }
+    for q in QUANTILES:
+        position = starts + q * (counts - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        stats[f"p{int(q * 100)}"] = sorted_prices[lower] + (sorted_prices[upper] - sorted_prices[lower]) * fraction
+    return stats
+
+def _write_stats(conn, keys, stats):
+    rows = [
+        (
+            *keys[group],
+            int(stats["count"][i]),
+            float(stats["mean"][i]),
+            float(stats["p25"][i]),
+            float(stats["p50"][i]),
+            float(stats["p75"][i]),
+            float(stats["min"][i]),
+            float(stats["max"][i]),
+        )
+        for i, group in enumerate(stats["group"])
+    ]
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO market_price_stats
+            (category_id, location_id, service_name, sample_count, mean_price, p25_price, p50_price, p75_price, min_price, max_price, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        """,
+        rows
+    )
+
+_PRICE_ROWS_QUERY = """
+    SELECT b.category_id, COALESCE(b.location_id, 0), sp.service_name, sp.current_price
+    FROM service_pricing sp
+    JOIN businesses b ON b.id = sp.business_id
+    WHERE sp.current_price IS NOT NULL AND b.category_id IS NOT NULL
+"""
+
+def _compute(conn, cursor):
+    """Group (category_id, location_id, service_name, price) rows and write their stats"""
+    key_codes, keys, codes, prices = {}, [], [], []
+    for category_id, location_id, service_name, price in cursor:
+        key = (category_id, location_id, service_name)
+        code = key_codes.get(key)
+        if code is None:
+            code = key_codes[key] = len(keys)
+            keys.append(key)
+        codes.append(code)
+        prices.append(price)
+    if codes:
+        _write_stats(conn, keys, grouped_price_stats(codes, prices))
+    return keys
+
+def rebuild_market_stats(conn):
+    """Recompute every group from service_pricing; returns the number of groups"""
+    conn.execute("DELETE FROM market_price_stats")
+    keys = _compute(conn, conn.execute(_PRICE_ROWS_QUERY))
+    conn.commit()
+    return len(keys)
+
+def refresh_market_stats(conn, keys):
+    """Recompute only the given (category_id, location_id, service_name) groups.
+
+    Runs inside the caller's transaction, after assign_dimensions(); groups
+    that no longer have any prices are removed. Each (category, location)
+    market is read once for all of its affected services.
+    """
+    markets = {}
+    for category_id, location_id, service_name in keys:
+        markets.setdefault((category_id, location_id), set()).add(service_name)
+    for (category_id, location_id), service_names in markets.items():
+        service_names = list(service_names)
+        placeholders = ",".join(["?" for _ in service_names])
+        conn.execute(
+            f"DELETE FROM market_price_stats WHERE category_id = ? AND location_id = ? AND service_name IN ({placeholders})",
+            [category_id, location_id] + service_names
+        )
+        # Probes idx_businesses_category_location_id, then idx_service_pricing_business_service
+        _compute(conn, conn.execute(
+            _PRICE_ROWS_QUERY + f" AND b.category_id = ? AND b.location_id IS ? AND sp.service_name IN ({placeholders})",
+            [category_id, location_id or None] + service_names
+        ))
+
+def business_price_keys(conn, business_ids, batch_size=500):
+    """The stats groups the given businesses' service_pricing rows contribute to"""
+    business_ids = list(business_ids)
+    keys = set()
+    for start in range(0, len(business_ids), batch_size):
+        batch = business_ids[start:start + batch_size]
+        placeholders = ",".join(["?" for _ in batch])
+        keys.update(
+            (row[0], row[1], row[2]) for row in conn.execute(
+                f"""
+                SELECT b.category_id, COALESCE(b.location_id, 0), sp.service_name
+                FROM service_pricing sp
+                JOIN businesses b ON b.id = sp.business_id
+                WHERE sp.business_id IN ({placeholders}) AND b.category_id IS NOT NULL
+                """,
+                batch
+            )
+        )
+    return keys
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain materialized market price statistics")
+    parser.add_argument("--rebuild", action="store_true", help="recompute every (category, location, service) group")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    with sqlite3.connect(DB_PATH) as conn:
+        print(f"✅ Rebuilt market price stats for {rebuild_market_stats(conn)} groups.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Revenue what-if simulation for candidate dynamic pricing configs.
+
+A year of hourly slots is priced with the candidate config (the same
+weekly/monthly multipliers dynamic_pricing.py compiles), given a
+baseline booking rate from the business's opening hours, rating and an
+hour/season demand profile, and evaluated under many demand scenarios.
+Each scenario draws a demand level and a price elasticity against the
+market median price, so revenue is
+
+    shock * sum over slots of price * demand * (price / market_p50) ** -elasticity
+
+Slots are first collapsed into each service's distinct price levels, so
+thousands of scenarios reduce to one (scenarios x levels) array product.
+"""
+
+import numpy as np
+
+from dynamic_pricing import (
+    DEFAULT_OFF_PEAK_HOURS, DEFAULT_PEAK_HOURS, HOURS_PER_WEEK, WEEKEND_DAYS,
+    is_enabled, monthly_multipliers, weekly_multipliers
+)
+
+HOURS_PER_YEAR = 365 * 24
+DEFAULT_SCENARIOS = 2000
+MAX_SCENARIOS = 20000
+
+# Expected bookings per open hour and service for an average-rated business at market price
+BASE_BOOKINGS_PER_HOUR = 0.5
+PEAK_DEMAND = 1.5
+OFF_PEAK_DEMAND = 0.7
+WEEKEND_DEMAND = 1.2
+# Month (index 0 is January) demand seasonality
+MONTHLY_DEMAND = np.array([0.85, 0.85, 0.95, 1.0, 1.05, 1.1, 1.15, 1.1, 1.0, 1.0, 0.95, 1.1])
+
+ELASTICITY_MEAN = 1.2
+ELASTICITY_SD = 0.3
+DEMAND_SHOCK_SD = 0.25
+
+def open_hours_mask(intervals):
+    """168 booleans, True for hours of the week that overlap an open interval.
+
+    intervals are (start_minute, end_minute) rows of business_open_intervals;
+    no intervals at all means the hours are unknown and every hour counts.
+    """
+    if not intervals:
+        return np.ones(HOURS_PER_WEEK, dtype=bool)
+    mask = np.zeros(HOURS_PER_WEEK, dtype=bool)
+    for start_minute, end_minute in intervals:
+        first, last = start_minute // 60, -(-end_minute // 60)
+        mask[np.arange(first, last) % HOURS_PER_WEEK] = True
+    return mask
+
+def weekly_demand_profile(config):
+    """Relative demand for each hour of the week, using the config's own peak/off-peak hours"""
+    peak_hours = set(config.get("peak_hours") or DEFAULT_PEAK_HOURS)
+    off_peak_hours = set(config.get("off_peak_hours") or DEFAULT_OFF_PEAK_HOURS) - peak_hours
+    day_of_week, hour = np.divmod(np.arange(HOURS_PER_WEEK), 24)
+
+    profile = np.ones(HOURS_PER_WEEK)
+    profile[np.isin(hour, list(peak_hours))] *= PEAK_DEMAND
+    profile[np.isin(hour, list(off_peak_hours))] *= OFF_PEAK_DEMAND
+    profile[np.isin(day_of_week, WEEKEND_DAYS)] *= WEEKEND_DEMAND
+    return profile
+
+def simulate_revenue(services, config, rating, open_intervals, start, scenarios=DEFAULT_SCENARIOS, seed=None):
+    """Simulate a year of revenue under config versus flat current prices.
+
+    services is a list of (service_name, current_price, market_median_price);
+    start is a naive local datetime the year starts at. Returns summary
+    statistics per config and per service.
+    """
+    names = [name for name, _, _ in services]
+    base_prices = np.array([price for _, price, _ in services], dtype=np.float64)
+    reference_prices = np.array(
+        [reference or price for _, price, reference in services], dtype=np.float64
+    )
+
+    # Calendar of the simulated year
+    start_hour = np.datetime64(start.replace(minute=0, second=0, microsecond=0), "h")
+    slot_times = start_hour + np.arange(HOURS_PER_YEAR)
+    months = slot_times.astype("datetime64[M]").astype(np.int64) % 12
+    start_hour_of_week = ((start.weekday() + 1) % 7) * 24 + start.hour
+    hour_of_week = (start_hour_of_week + np.arange(HOURS_PER_YEAR)) % HOURS_PER_WEEK
+
+    # Baseline bookings per slot (per service) before price effects
+    rating_factor = 0.5 + (rating / 5.0) if rating else 1.0
+    open_mask = open_hours_mask(open_intervals)
+    demand = (
+        BASE_BOOKINGS_PER_HOUR * rating_factor
+        * open_mask[hour_of_week]
+        * weekly_demand_profile(config)[hour_of_week]
+        * MONTHLY_DEMAND[months]
+    )
+
+    # Candidate prices per slot and service
+    # Same check as compile_schedules, so the simulation prices what quotes will charge
+    if is_enabled(config):
+        multipliers = (
+            np.array(weekly_multipliers(config))[hour_of_week]
+            * np.array(monthly_multipliers(config))[months]
+        )
+    else:
+        multipliers = np.ones(HOURS_PER_YEAR)
+    prices = base_prices[None, :] * multipliers[:, None]
+    if config.get("min_price") or config.get("max_price"):
+        prices = np.clip(prices, config.get("min_price") or None, config.get("max_price") or None)
+
+    # Collapse slots into (service, distinct price) levels weighted by their demand
+    level_prices, level_weights, level_services = [], [], []
+    for j in range(len(services)):
+        levels, inverse = np.unique(prices[:, j], return_inverse=True)
+        level_prices.append(levels)
+        level_weights.append(np.bincount(inverse, weights=demand, minlength=len(levels)))
+        level_services.append(np.full(len(levels), j))
+    level_prices = np.concatenate(level_prices)
+    level_weights = np.concatenate(level_weights)
+    level_services = np.concatenate(level_services)
+
+    rng = np.random.default_rng(seed)
+    elasticity = np.clip(rng.normal(ELASTICITY_MEAN, ELASTICITY_SD, scenarios), 0.1, None)
+    shock = rng.lognormal(-DEMAND_SHOCK_SD ** 2 / 2, DEMAND_SHOCK_SD, scenarios)
+
+    def revenue_by_service(level_price, level_weight, level_service):
+        """(scenarios x services) revenue from demand-weighted price levels"""
+        to_service = np.zeros((len(level_price), len(services)))
+        to_service[np.arange(len(level_price)), level_service] = 1.0
+        response = np.exp(-np.outer(elasticity, np.log(level_price / reference_prices[level_service])))
+        return shock[:, None] * ((response * (level_price * level_weight)[None, :]) @ to_service)
+
+    candidate = revenue_by_service(level_prices, level_weights, level_services)
+    baseline = revenue_by_service(base_prices, np.full(len(services), demand.sum()), np.arange(len(services)))
+
+    candidate_total = candidate.sum(axis=1)
+    baseline_total = baseline.sum(axis=1)
+    uplift = candidate_total - baseline_total
+    # Identical prices can still differ by float summation order
+    uplift[np.abs(uplift) < 1e-9 * baseline_total] = 0.0
+
+    def summary(values):
+        # + 0.0 turns rounding noise like -0.0 into 0.0
+        p5, p50, p95 = np.percentile(values, [5, 50, 95])
+        return {"mean": round(float(values.mean()), 2) + 0.0, "p5": round(float(p5), 2) + 0.0,
+                "p50": round(float(p50), 2) + 0.0, "p95": round(float(p95), 2) + 0.0}
+
+    return {
+        "scenarios": scenarios,
+        "hours_simulated": HOURS_PER_YEAR,
+        "open_hours_per_week": int(open_mask.sum()),
+        "baseline": summary(baseline_total),
+        "candidate": summary(candidate_total),
+        "uplift": {
+            **summary(uplift),
+            "percent": round(float(uplift.mean() / baseline_total.mean() * 100), 2) + 0.0 if baseline_total.mean() else 0.0,
+            "probability_positive": round(float((uplift > 0).mean()), 3)
+        },
+        "services": [
+            {
+                "service_name": names[j],
+                "current_price": float(base_prices[j]),
+                "market_median_price": float(reference_prices[j]),
+                "average_candidate_price": round(float(np.average(prices[:, j], weights=demand) if demand.any() else prices[:, j].mean()), 2),
+                "baseline_revenue": round(float(baseline[:, j].mean()), 2),
+                "candidate_revenue": round(float(candidate[:, j].mean()), 2)
+            }
+            for j in range(len(services))
+        ]
+    }
@@ -1,24 +1,45 @@
 from flask import request, jsonify
-from db import get_db
+from db import (
+    MINUTES_PER_DAY, assign_dimensions, business_hours_rows, dimension_ids, dimension_names,
+    get_db, insert_business_children, location_area, normalize_businesses, prefix_range, service_pricing_rows,
+    text_match_condition, upsert_business_hours
+)
 from flask import Blueprint
+import bulk_import
+import dynamic_pricing
+import image_store
+import map_clusters
+import market_stats
+import pricing_simulator
+import search_snapshot
+import semantic_index
+import similar_index
+from text_normalize import normalize_text
 import jwt
 import datetime
 import os
 import secrets
 import requests
-from werkzeug.utils import secure_filename
 from functools import wraps
 import json
+import base64
+import numpy as np
 import sqlite3
 import bcrypt
 from passlib.hash import bcrypt as passlib_bcrypt
 from passlib.exc import MissingBackendError
 import openai
 import random
+import threading
+from zoneinfo import ZoneInfo
 
 SECRET_KEY = os.environ.get("SECRET_KEY", "dev_secret_key")
 GOOGLE_MAPS_API_KEY = os.environ.get("GOOGLE_MAPS_API_KEY", "your_google_maps_api_key")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "your-openai-api-key-here")
+# Business hours are entered in local time; open_now / open_at are evaluated in this zone
+BUSINESS_TIMEZONE = ZoneInfo(os.environ.get("BUSINESS_TIMEZONE", "Asia/Tbilisi"))
+# Users allowed to bulk import reviews and businesses owned by others
+IMPORT_ADMIN_USER_IDS = {int(uid) for uid in os.environ.get("IMPORT_ADMIN_USER_IDS", "").split(",") if uid.strip()}
 
 # Initialize OpenAI client
 if OPENAI_API_KEY and OPENAI_API_KEY != "your-openai-api-key-here":
@@ -31,8 +52,25 @@ if OPENAI_API_KEY and OPENAI_API_KEY != "your-openai-api-key-here":
 else:
     openai_client = None
 
-UPLOAD_FOLDER = "uploads"
+UPLOAD_FOLDER = image_store.UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+PRICE_COMPARISON_LIMIT = 20
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+# Nearest neighbours considered before filters in semantic/hybrid search
+SEMANTIC_CANDIDATES = 500
+# Business columns returned to clients; the others (revisions, dimension ids, normalized text) are internal
+BUSINESS_COLUMNS = (
+    "id, name, category, description, services, service_pricing, location, latitude, longitude, image_url, "
+    "rating, total_reviews, socials, owner_id, business_hours, dynamic_pricing_config, ai_analysis_data, "
+    "market_position, revenue_potential_score"
+)
+# Relevance added in hybrid mode when the keyword also matches
+HYBRID_KEYWORD_WEIGHT = 0.5
+PRICE_HISTORY_DAYS = 30
+PRICE_HISTORY_RAW_LIMIT = 5000
+# Ranges longer than this are served weekly when resolution=auto
+PRICE_HISTORY_DAILY_MAX_DAYS = 180
+PRICE_HISTORY_ROLLUPS = {"day": "price_history_daily", "week": "price_history_weekly"}
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -100,6 +138,43 @@ def geocode_address(address):
         print(f"Geocoding error: {e}")
         return None, None
 
+def minute_of_week(moment):
+    """Minutes since Sunday 00:00 (day_of_week 0 is Sunday, matching business_hours)"""
+    day_of_week = (moment.weekday() + 1) % 7
+    return day_of_week * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+def parse_local_time(value):
+    """ISO datetime as business local time; naive values are taken as already local, None means now"""
+    if not value:
+        return datetime.datetime.now(BUSINESS_TIMEZONE)
+    moment = datetime.datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(BUSINESS_TIMEZONE)
+    return moment
+
+def parse_open_filter(args):
+    """Minute-of-week to filter on from ?open_now=true or ?open_at=<ISO datetime>, else None"""
+    open_at = args.get("open_at")
+    if open_at:
+        return minute_of_week(parse_local_time(open_at))
+    if args.get("open_now", "").lower() in ("1", "true", "yes"):
+        return minute_of_week(datetime.datetime.now(BUSINESS_TIMEZONE))
+    return None
+
+def open_at_condition(minute):
+    """SQL condition (and params) matching businesses open at the given minute of the week.
+
+    No interval is longer than a day, so the start_minute index is probed over a
+    one-day range instead of scanning every interval.
+    """
+    return (
+        """b.id IN (
+            SELECT business_id FROM business_open_intervals
+            WHERE start_minute BETWEEN ? AND ? AND end_minute > ?
+        )""",
+        [minute - MINUTES_PER_DAY, minute, minute]
+    )
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -114,9 +189,9 @@ def list_businesses():
     category = request.args.get("category")
     with get_db() as conn:
         if category:
-            cursor = conn.execute("SELECT * FROM businesses WHERE category = ?", (category,))
+            cursor = conn.execute(f"SELECT {BUSINESS_COLUMNS} FROM businesses WHERE category = ?", (category,))
         else:
-            cursor = conn.execute("SELECT * FROM businesses")
+            cursor = conn.execute(f"SELECT {BUSINESS_COLUMNS} FROM businesses")
         businesses = [dict(row) for row in cursor.fetchall()]
     return jsonify(businesses), 200
 
@@ -124,125 +199,122 @@ def list_businesses():
 def search_businesses():
     # Get search parameters
     query = request.args.get("q", "")
+    mode = request.args.get("mode", "keyword")
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": f"mode must be one of {', '.join(SEARCH_MODES)}"}), 400
     categories = request.args.get("category", "").split(",") if request.args.get("category") else []
     locations = request.args.get("location", "").split(",") if request.args.get("location") else []
     min_rating = request.args.get("minRating")
     max_rating = request.args.get("maxRating")
-    sort_by = request.args.get("sortBy", "name")
-    sort_order = request.args.get("sortOrder", "asc")
+    ranked = bool(query) and mode != "keyword"
+    sort_by = request.args.get("sortBy", "relevance" if ranked else "name")
+    sort_order = request.args.get("sortOrder", "desc" if ranked and sort_by == "relevance" else "asc")
     page = int(request.args.get("page", 1))
     limit = int(request.args.get("limit", 12))
     offset = (page - 1) * limit
+    try:
+        open_minute = parse_open_filter(request.args)
+    except ValueError:
+        return jsonify({"error": "open_at must be an ISO 8601 datetime"}), 400
 
+    if sort_by != "relevance" and sort_by not in search_snapshot.SnapshotView.SORT_KEYS:
+        sort_by = "name"
+    
     with get_db() as conn:
-        # Build the base query
-        base_query = """
-            SELECT b.*, 
-                   COALESCE(AVG(r.rating), 0) as avg_rating,
-                   COUNT(r.id) as total_reviews
-            FROM businesses b
-            LEFT JOIN reviews r ON b.id = r.business_id
-        """
+        view = search_snapshot.search_view(conn)
+        
+        # Text and open-hours predicates are resolved to an id set in SQL;
+        # everything else is a vectorized mask over the columnar snapshot
+        # Matched against the normalized shadow columns (trigram index), so case, accents and script don't matter
+        keyword_condition, keyword_params = text_match_condition(normalize_text(query))
+        relevance = "0"
+        relevance_params = []
+        if ranked:
+            # Nearest neighbours from the local vector index, joined in through a per-connection temp table
+            conn.execute("CREATE TEMP TABLE search_scores (id INTEGER PRIMARY KEY, score REAL)")
+            conn.executemany(
+                "INSERT INTO search_scores (id, score) VALUES (?, ?)",
+                semantic_index.semantic_search(conn, query, SEMANTIC_CANDIDATES)
+            )
+            relevance = "COALESCE(s.score, 0)"
+            if mode == "hybrid":
+                relevance += f" + {HYBRID_KEYWORD_WEIGHT} * {keyword_condition}"
+                relevance_params = list(keyword_params)
         
         where_conditions = []
-        params = []
+        params = list(relevance_params)
         
         # Add search query condition
         if query:
-            where_conditions.append("(b.name LIKE ? OR b.description LIKE ? OR b.category LIKE ? OR b.location LIKE ?)")
-            search_term = f"%{query}%"
-            params.extend([search_term, search_term, search_term, search_term])
-        
-        # Add category filter
-        if categories and categories[0]:
-            placeholders = ",".join(["?" for _ in categories])
-            where_conditions.append(f"b.category IN ({placeholders})")
-            params.extend(categories)
-        
-        # Add location filter
-        if locations and locations[0]:
-            placeholders = ",".join(["?" for _ in locations])
-            where_conditions.append(f"b.location IN ({placeholders})")
-            params.extend(locations)
+            if mode == "semantic":
+                where_conditions.append("b.id IN (SELECT id FROM search_scores)")
+            elif mode == "hybrid":
+                where_conditions.append(f"(b.id IN (SELECT id FROM search_scores) OR {keyword_condition})")
+                params.extend(keyword_params)
+            else:
+                where_conditions.append(keyword_condition)
+                params.extend(keyword_params)
         
-        # Rating filters will be handled in HAVING clause after GROUP BY
+        # Add open-hours filter (index range probe on business_open_intervals)
+        if open_minute is not None:
+            open_condition, open_params = open_at_condition(open_minute)
+            where_conditions.append(open_condition)
+            params.extend(open_params)
         
-        # Combine WHERE conditions
+        matched_ids, relevance_by_id = None, {}
         if where_conditions:
-            base_query += " WHERE " + " AND ".join(where_conditions)
-        
-        # Add GROUP BY
-        base_query += " GROUP BY b.id"
-        
-        # Add HAVING clause for rating filters (after GROUP BY)
-        having_conditions = []
-        if min_rating:
-            having_conditions.append("COALESCE(AVG(r.rating), 0) >= ?")
-            params.append(float(min_rating))
-        
-        if max_rating:
-            having_conditions.append("COALESCE(AVG(r.rating), 0) <= ?")
-            params.append(float(max_rating))
-        
-        if having_conditions:
-            base_query += " HAVING " + " AND ".join(having_conditions)
-        
-        # Add ORDER BY
-        order_mapping = {
-            "name": "b.name",
-            "rating": "avg_rating",
-            "recent": "b.id",  # Assuming newer businesses have higher IDs
-            "distance": "b.id"  # Placeholder for distance sorting
-        }
-        
-        sort_field = order_mapping.get(sort_by, "b.name")
-        base_query += f" ORDER BY {sort_field} {sort_order.upper()}"
-        
-        # Add pagination
-        base_query += " LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
-        
-        # Execute the query
-        cursor = conn.execute(base_query, params)
-        businesses = [dict(row) for row in cursor.fetchall()]
-        
-        # Get total count for pagination
-        count_query = """
-            SELECT COUNT(DISTINCT b.id) as total
-            FROM businesses b
-            LEFT JOIN reviews r ON b.id = r.business_id
-        """
+            id_query = f"SELECT b.id, {relevance} AS relevance FROM businesses b"
+            if ranked:
+                id_query += " LEFT JOIN search_scores s ON s.id = b.id"
+            id_query += " WHERE " + " AND ".join(where_conditions)
+            relevance_by_id = dict(conn.execute(id_query, params).fetchall())
+            matched_ids = np.fromiter(relevance_by_id.keys(), dtype=np.int64, count=len(relevance_by_id))
+            # Rows written after the view was taken are not in it yet; they show up on the next request
+            in_view = np.isin(matched_ids, view.columns["id"])
+            if not in_view.all():
+                matched_ids = matched_ids[in_view]
+                relevance_by_id = {int(i): relevance_by_id[int(i)] for i in matched_ids}
         
-        count_where_conditions = []
-        count_params = []
-        
-        if query:
-            count_where_conditions.append("(b.name LIKE ? OR b.description LIKE ? OR b.category LIKE ? OR b.location LIKE ?)")
-            search_term = f"%{query}%"
-            count_params.extend([search_term, search_term, search_term, search_term])
-        
-        if categories and categories[0]:
-            placeholders = ",".join(["?" for _ in categories])
-            count_where_conditions.append(f"b.category IN ({placeholders})")
-            count_params.extend(categories)
-        
-        if locations and locations[0]:
-            placeholders = ",".join(["?" for _ in locations])
-            count_where_conditions.append(f"b.location IN ({placeholders})")
-            count_params.extend(locations)
+        # Facet values are dimension names; full addresses are reduced to their city/district
+        mask = view.mask(
+            category_ids=dimension_ids(conn, "categories", categories) if any(categories) else None,
+            location_ids=dimension_ids(conn, "locations", [location_area(l) or l for l in locations]) if any(locations) else None,
+            min_rating=float(min_rating) if min_rating else None,
+            max_rating=float(max_rating) if max_rating else None,
+            ids=matched_ids
+        )
+        total_count = int(mask.sum())
         
-        if count_where_conditions:
-            count_query += " WHERE " + " AND ".join(count_where_conditions)
+        if sort_by == "relevance":
+            sort_values = np.zeros(len(view))
+            if relevance_by_id:
+                sort_values[view.positions(matched_ids)] = np.fromiter(
+                    relevance_by_id.values(), dtype=np.float64, count=len(relevance_by_id)
+                )
+        else:
+            sort_values = view.columns[search_snapshot.SnapshotView.SORT_KEYS[sort_by]]
+        rows = view.page(mask, sort_values, sort_order.lower() == "desc", offset, limit)
         
-        count_cursor = conn.execute(count_query, count_params)
-        total_count = count_cursor.fetchone()["total"]
+        # Hydrate only the final page from SQLite, in snapshot order
+        page_ids = [int(i) for i in view.columns["id"][rows]]
+        hydrated = {}
+        if page_ids:
+            placeholders = ",".join(["?" for _ in page_ids])
+            hydrated = {
+                row["id"]: dict(row)
+                for row in conn.execute(f"SELECT {BUSINESS_COLUMNS} FROM businesses WHERE id IN ({placeholders})", page_ids)
+            }
+        businesses = []
+        for business_id, row in zip(page_ids, rows):
+            if business_id in hydrated:
+                business = hydrated[business_id]
+                business["avg_rating"] = float(view.columns["rating"][row])
+                business["relevance"] = relevance_by_id.get(business_id, 0)
+                businesses.append(business)
         
         # Get filter options for response
-        categories_cursor = conn.execute("SELECT DISTINCT category FROM businesses")
-        available_categories = [row["category"] for row in categories_cursor.fetchall()]
-        
-        locations_cursor = conn.execute("SELECT DISTINCT location FROM businesses")
-        available_locations = [row["location"] for row in locations_cursor.fetchall()]
+        available_categories = dimension_names(conn, "categories", np.unique(view.columns["category"]))
+        available_locations = dimension_names(conn, "locations", np.unique(view.columns["location"]))
         
         # Get rating range - simplified approach
         rating_cursor = conn.execute("""
@@ -292,25 +364,37 @@ def get_search_suggestions():
     if not query or len(query) < 2:
         return jsonify({"suggestions": []}), 200
     
+    # Suggestions match normalized names, so "tbilisi" also finds "თბილისი"
+    search_term = normalize_text(query)
+    name_condition, name_params = text_match_condition(search_term, ("name_norm",))
     with get_db() as conn:
-        # Search in business names
+        # Search in business names (substring, through the trigram index)
         business_cursor = conn.execute(
-            "SELECT DISTINCT name as text, 'business' as type, COUNT(*) as count FROM businesses WHERE name LIKE ? GROUP BY name LIMIT 3",
-            (f"%{query}%",)
+            f"SELECT DISTINCT name as text, 'business' as type, COUNT(*) as count FROM businesses b WHERE {name_condition} GROUP BY name LIMIT 3",
+            name_params
         )
         business_suggestions = [dict(row) for row in business_cursor.fetchall()]
         
-        # Search in categories
+        # Search in categories by name prefix, a range seek on the name_norm index
+        # (counts are index lookups on businesses.category_id)
         category_cursor = conn.execute(
-            "SELECT DISTINCT category as text, 'category' as type, COUNT(*) as count FROM businesses WHERE category LIKE ? GROUP BY category LIMIT 2",
-            (f"%{query}%",)
+            """
+            SELECT c.name as text, 'category' as type,
+                   (SELECT COUNT(*) FROM businesses b WHERE b.category_id = c.id) as count
+            FROM categories c WHERE c.name_norm >= ? AND c.name_norm < ? AND count > 0 LIMIT 2
+            """,
+            prefix_range(search_term)
         )
         category_suggestions = [dict(row) for row in category_cursor.fetchall()]
         
-        # Search in locations
+        # Search in locations (cities/districts from the locations dimension)
         location_cursor = conn.execute(
-            "SELECT DISTINCT location as text, 'location' as type, COUNT(*) as count FROM businesses WHERE location LIKE ? GROUP BY location LIMIT 2",
-            (f"%{query}%",)
+            """
+            SELECT l.name as text, 'location' as type,
+                   (SELECT COUNT(*) FROM businesses b WHERE b.location_id = l.id) as count
+            FROM locations l WHERE l.name_norm >= ? AND l.name_norm < ? AND count > 0 LIMIT 2
+            """,
+            prefix_range(search_term)
         )
         location_suggestions = [dict(row) for row in location_cursor.fetchall()]
         
@@ -326,13 +410,16 @@ def get_search_suggestions():
 @bp.route("/businesses/filter-options", methods=["GET"])
 def get_filter_options():
     with get_db() as conn:
-        # Get categories
-        categories_cursor = conn.execute("SELECT DISTINCT category FROM businesses")
-        categories = [row["category"] for row in categories_cursor.fetchall()]
+        # Get categories and locations that have at least one business
+        categories_cursor = conn.execute(
+            "SELECT name FROM categories c WHERE EXISTS (SELECT 1 FROM businesses b WHERE b.category_id = c.id) ORDER BY name"
+        )
+        categories = [row["name"] for row in categories_cursor.fetchall()]
         
-        # Get locations
-        locations_cursor = conn.execute("SELECT DISTINCT location FROM businesses")
-        locations = [row["location"] for row in locations_cursor.fetchall()]
+        locations_cursor = conn.execute(
+            "SELECT name FROM locations l WHERE EXISTS (SELECT 1 FROM businesses b WHERE b.location_id = l.id) ORDER BY name"
+        )
+        locations = [row["name"] for row in locations_cursor.fetchall()]
         
         # Get rating range - simplified approach
         rating_cursor = conn.execute("""
@@ -355,7 +442,7 @@ def get_filter_options():
 @bp.route("/businesses/<int:biz_id>", methods=["GET"])
 def get_business(biz_id):
     with get_db() as conn:
-        cursor = conn.execute("SELECT * FROM businesses WHERE id = ?", (biz_id,))
+        cursor = conn.execute(f"SELECT {BUSINESS_COLUMNS} FROM businesses WHERE id = ?", (biz_id,))
         business = cursor.fetchone()
         
         if business:
@@ -376,6 +463,75 @@ def get_business(biz_id):
             return jsonify(business_dict), 200
     return jsonify({"error": "Business not found"}), 404
 
+@bp.route("/businesses/<int:biz_id>/similar", methods=["GET"])
+def get_similar_businesses(biz_id):
+    """Businesses most like this one by name, category, description and services"""
+    limit = min(max(request.args.get("limit", similar_index.DEFAULT_LIMIT, type=int), 1), similar_index.MAX_LIMIT)
+    
+    with get_db() as conn:
+        neighbours = similar_index.similar_businesses(conn, biz_id, limit)
+        if neighbours is None:
+            return jsonify({"error": "Business not found"}), 404
+        
+        scores = dict(neighbours)
+        rows = conn.execute(
+            f"""
+            SELECT id, name, category, location, image_url, rating, total_reviews
+            FROM businesses WHERE id IN ({','.join(['?' for _ in scores])})
+            """,
+            list(scores)
+        ).fetchall() if scores else []
+    
+    similar = sorted(
+        ({**dict(row), "similarity": round(scores[row["id"]], 4)} for row in rows),
+        key=lambda business: -business["similarity"]
+    )
+    return jsonify({"business_id": biz_id, "similar": similar}), 200
+
+@bp.route("/businesses/map", methods=["GET"])
+def get_map_clusters():
+    """Clustered markers for a map viewport (?bbox=west,south,east,north&zoom=)"""
+    try:
+        west, south, east, north = (float(part) for part in request.args.get("bbox", "").split(","))
+    except ValueError:
+        return jsonify({"error": "bbox must be west,south,east,north in degrees"}), 400
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south <= north <= 90):
+        return jsonify({"error": "bbox must be west,south,east,north in degrees"}), 400
+    zoom = request.args.get("zoom", type=int)
+    if zoom is None:
+        return jsonify({"error": "zoom must be an integer"}), 400
+    
+    with get_db() as conn:
+        view = search_snapshot.search_view(conn)
+        zoom_used, clusters = map_clusters.viewport_clusters(view, (west, south, east, north), zoom)
+        
+        top_ids = [top_id for _, _, _, top_id in clusters]
+        businesses = {}
+        if top_ids:
+            rows = conn.execute(
+                f"""
+                SELECT id, name, category, location, image_url, rating, total_reviews, latitude, longitude
+                FROM businesses WHERE id IN ({','.join(['?' for _ in top_ids])})
+                """,
+                top_ids
+            ).fetchall()
+            businesses = {row["id"]: dict(row) for row in rows}
+    
+    return jsonify({
+        "bbox": [west, south, east, north],
+        "zoom": zoom_used,
+        "total": sum(count for count, _, _, _ in clusters),
+        "clusters": [
+            {
+                "count": count,
+                "latitude": round(latitude, 6),
+                "longitude": round(longitude, 6),
+                "top_business": businesses.get(top_id)
+            }
+            for count, latitude, longitude, top_id in clusters
+        ]
+    }), 200
+
 @bp.route("/businesses", methods=["POST"])
 @require_auth
 def add_business():
@@ -401,7 +557,8 @@ def add_business():
     user_id = request.user_id
 
     with get_db() as conn:
-        conn.execute(
+        # Business row and its child rows commit together in one transaction
+        cursor = conn.execute(
             """
             INSERT INTO businesses (name, category, description, services, service_pricing, image_url, location, latitude, longitude, socials, rating, owner_id, business_hours)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -422,42 +579,47 @@ def add_business():
                 data.get("business_hours", "")
             ),
         )
-        conn.commit()
-        new_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
-        
-        # Insert service pricing data if provided
-        if service_pricing:
-            for service_name, pricing_data in service_pricing.items():
-                current_price = pricing_data.get("current_price", 0)
-                recommended_price = pricing_data.get("recommended_price", current_price)
-                pricing_strategy = pricing_data.get("pricing_strategy", "competitive")
-                confidence_score = pricing_data.get("confidence_score", 0.8)
-                
-                conn.execute(
-                    """
-                    INSERT INTO service_pricing (business_id, service_name, current_price, recommended_price, pricing_strategy, confidence_score)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                    (new_id, service_name, current_price, recommended_price, pricing_strategy, confidence_score)
-                )
+        new_id = cursor.lastrowid
         
-        # Insert business hours if provided
-        hours_data = data.get("hours", [])
-        for hour in hours_data:
-            day_of_week = hour.get("day_of_week")
-            open_time = hour.get("open_time")
-            close_time = hour.get("close_time")
-            is_closed = hour.get("is_closed", False)
-            
-            if day_of_week is not None and 0 <= day_of_week <= 6:
-                conn.execute(
-                    "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time, is_closed) VALUES (?, ?, ?, ?, ?)",
-                    (new_id, day_of_week, open_time, close_time, is_closed)
-                )
+        # Insert service pricing and business hours if provided
+        insert_business_children(
+            conn,
+            service_pricing_rows(new_id, service_pricing),
+            business_hours_rows(new_id, data.get("hours", []))
+        )
+        # Market groups are keyed by dimension ids, so resolve those first
+        assign_dimensions(conn)
+        market_stats.refresh_market_stats(conn, market_stats.business_price_keys(conn, [new_id]))
+        normalize_businesses(conn)
         
         conn.commit()
     return jsonify({"id": new_id}), 201
 
+@bp.route("/businesses/import", methods=["POST"])
+@require_auth
+def import_businesses():
+    """Bulk import businesses (and, for import admins, reviews) from an NDJSON request body"""
+    is_admin = request.user_id in IMPORT_ADMIN_USER_IDS
+    business_ids = []
+    with get_db() as conn:
+        report = bulk_import.import_ndjson(
+            conn,
+            request.stream,
+            owner_id=None if is_admin else request.user_id,
+            allow_reviews=is_admin,
+            inserted_ids=business_ids
+        )
+    
+    # Geocoding is deferred so the import itself never waits on the Maps API;
+    # each import only geocodes the businesses it created
+    if business_ids:
+        def geocode_imported():
+            with get_db() as geocode_conn:
+                bulk_import.geocode_pending(geocode_conn, geocode_address, business_ids)
+        threading.Thread(target=geocode_imported, name="import-geocoder", daemon=True).start()
+    
+    return jsonify(report), 200
+
 @bp.route("/businesses/<int:biz_id>/images", methods=["POST"])
 @require_auth
 def upload_business_image(biz_id):
@@ -477,22 +639,30 @@ def upload_business_image(biz_id):
     if not allowed_file(file.filename):
         return jsonify({"error": "File type not allowed"}), 400
     
-    # Save the file
-    filename = secure_filename(file.filename)
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_filename = f"{timestamp}_{filename}"
-    filepath = os.path.join(UPLOAD_FOLDER, unique_filename)
-    file.save(filepath)
+    # Hash while streaming to a temp file; identical images share one stored blob.
+    # The extension comes from the content, so the same bytes uploaded as .jpg and .png are one blob
+    digest, tmp_path = image_store.hash_to_temp(file.stream)
+    extension = image_store.sniff_extension(tmp_path)
+    if extension is None:
+        os.remove(tmp_path)
+        return jsonify({"error": "File type not allowed"}), 400
+    image_url = image_store.url_for_blob(image_store.blob_path(digest, extension))
     
-    # Store in database
-    image_url = f"/uploads/{unique_filename}"
-    with get_db() as conn:
-        conn.execute(
-            "INSERT INTO business_images (business_id, image_url) VALUES (?, ?)",
-            (biz_id, image_url)
-        )
-        conn.commit()
-        image_id = conn.execute("SELECT last_insert_rowid() as id").fetchone()["id"]
+    try:
+        with get_db() as conn:
+            # Hold the write lock while placing the blob so a concurrent delete
+            # of the last reference cannot unlink it before our row exists
+            conn.execute("BEGIN IMMEDIATE")
+            image_store.place_blob(tmp_path, image_store.blob_path(digest, extension))
+            cursor = conn.execute(
+                "INSERT INTO business_images (business_id, image_url, content_hash) VALUES (?, ?, ?)",
+                (biz_id, image_url, digest)
+            )
+            image_id = cursor.lastrowid
+            conn.commit()
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
     
     return jsonify({"id": image_id, "image_url": image_url}), 201
 
@@ -555,7 +725,15 @@ def update_business(biz_id):
             set_clause = ", ".join([f"{k} = ?" for k in update_data.keys()])
             values = list(update_data.values()) + [biz_id]
             
+            # Moving category or location moves this business's prices between market groups
+            moves_market = "category" in update_data or "location" in update_data
+            stale_keys = market_stats.business_price_keys(conn, [biz_id]) if moves_market else set()
+            
             conn.execute(f"UPDATE businesses SET {set_clause} WHERE id = ?", values)
+            if moves_market:
+                assign_dimensions(conn)
+                market_stats.refresh_market_stats(conn, stale_keys | market_stats.business_price_keys(conn, [biz_id]))
+            normalize_businesses(conn)
             conn.commit()
         
         return jsonify({"message": "Business updated successfully"}), 200
@@ -564,6 +742,7 @@ def update_business(biz_id):
 @require_auth
 def delete_business_image(biz_id, image_id):
     with get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
         # Get the image to delete
         image = conn.execute(
             "SELECT * FROM business_images WHERE id = ? AND business_id = ?", 
@@ -571,16 +750,12 @@ def delete_business_image(biz_id, image_id):
         ).fetchone()
         
         if not image:
+            conn.rollback()
             return jsonify({"error": "Image not found"}), 404
         
-        # Delete the file
-        image_dict = dict(image)
-        filepath = os.path.join(UPLOAD_FOLDER, image_dict["image_url"].split("/")[-1])
-        if os.path.exists(filepath):
-            os.remove(filepath)
-        
-        # Delete from database
+        # Delete from database, then the file only if this was its last reference
         conn.execute("DELETE FROM business_images WHERE id = ?", (image_id,))
+        image_store.release_blob(conn, image["image_url"])
         conn.commit()
     
     return jsonify({"message": "Image deleted successfully"}), 200
@@ -631,26 +806,498 @@ def set_business_hours(biz_id):
         if business["owner_id"] != request.user_id:
             return jsonify({"error": "Unauthorized"}), 403
         
-        # Delete existing hours
-        conn.execute("DELETE FROM business_hours WHERE business_id = ?", (biz_id,))
-        
-        # Insert new hours
-        hours_data = data.get("hours", [])
-        for hour in hours_data:
-            day_of_week = hour.get("day_of_week")
-            open_time = hour.get("open_time")
-            close_time = hour.get("close_time")
-            is_closed = hour.get("is_closed", False)
-            
-            if day_of_week is not None and 0 <= day_of_week <= 6:
-                conn.execute(
-                    "INSERT INTO business_hours (business_id, day_of_week, open_time, close_time, is_closed) VALUES (?, ?, ?, ?, ?)",
-                    (biz_id, day_of_week, open_time, close_time, is_closed)
-                )
+        # Only days that actually changed are written (and their open intervals rebuilt)
+        upsert_business_hours(conn, biz_id, business_hours_rows(biz_id, data.get("hours", [])))
         
         conn.commit()
         return jsonify({"message": "Business hours updated successfully"}), 200
 
+@bp.route("/businesses/<int:biz_id>/dynamic-pricing", methods=["POST"])
+@require_auth
+def set_dynamic_pricing(biz_id):
+    """Save a business's dynamic pricing config and compile its weekly price schedules"""
+    config = request.get_json(force=True)
+    error = dynamic_pricing.validate_config(config)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    with get_db() as conn:
+        business = conn.execute(
+            "SELECT owner_id FROM businesses WHERE id = ?", 
+            (biz_id,)
+        ).fetchone()
+        
+        if not business:
+            return jsonify({"error": "Business not found"}), 404
+        
+        if business["owner_id"] != request.user_id:
+            return jsonify({"error": "Unauthorized"}), 403
+        
+        conn.execute(
+            "UPDATE businesses SET dynamic_pricing_config = ? WHERE id = ?",
+            (json.dumps(config), biz_id)
+        )
+        compiled = dynamic_pricing.compile_schedules(conn, biz_id, config)
+        conn.commit()
+        
+        return jsonify({
+            "message": "Dynamic pricing updated successfully",
+            "config": config,
+            "compiled_services": compiled
+        }), 200
+
+def quote_at(conn, biz_id, at, service_names=None):
+    moment = parse_local_time(at)
+    quotes = dynamic_pricing.quote(conn, biz_id, minute_of_week(moment) // 60, moment.month, service_names)
+    return moment, quotes
+
+@bp.route("/businesses/<int:biz_id>/price", methods=["GET"])
+def get_service_price(biz_id):
+    """Current (or ?at=<ISO datetime>) price of one service"""
+    service_name = request.args.get("service")
+    if not service_name:
+        return jsonify({"error": "service is required"}), 400
+    
+    with get_db() as conn:
+        try:
+            moment, quotes = quote_at(conn, biz_id, request.args.get("at"), [service_name])
+        except ValueError:
+            return jsonify({"error": "Invalid at, expected an ISO datetime"}), 400
+    
+    if not quotes:
+        return jsonify({"error": "Service not found"}), 404
+    return jsonify({**quotes[0], "at": moment.isoformat()}), 200
+
+@bp.route("/businesses/<int:biz_id>/quote", methods=["POST"])
+def quote_services(biz_id):
+    """Price a business's whole menu, or the listed services, at a timestamp (default now)"""
+    data = request.get_json(silent=True) or {}
+    service_names = data.get("services")
+    if service_names is not None and not (
+        isinstance(service_names, list) and all(isinstance(name, str) for name in service_names)
+    ):
+        return jsonify({"error": "services must be a list of service names"}), 400
+    
+    with get_db() as conn:
+        try:
+            moment, quotes = quote_at(conn, biz_id, data.get("at"), service_names)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Invalid at, expected an ISO datetime"}), 400
+    
+    return jsonify({
+        "business_id": biz_id,
+        "at": moment.isoformat(),
+        "quotes": quotes,
+        "total": round(sum(q["price"] for q in quotes if q["price"] is not None), 2)
+    }), 200
+
+def price_trends(entries):
+    """Direction and volatility of each service's price series, averaged over services"""
+    series = {}
+    for entry in entries:
+        series.setdefault(entry["service_name"], []).append(entry["price"])
+    if not series:
+        return {"price_trend": "stable", "price_volatility": 0}
+    
+    changes, deviations = [], []
+    for prices in series.values():
+        mean = sum(prices) / len(prices)
+        deviations.append((sum((p - mean) ** 2 for p in prices) / len(prices)) ** 0.5)
+        if prices[0]:
+            changes.append((prices[-1] - prices[0]) / prices[0])
+    change = sum(changes) / len(changes) if changes else 0
+    return {
+        "price_trend": "increasing" if change > 0.02 else "decreasing" if change < -0.02 else "stable",
+        "price_volatility": round(sum(deviations) / len(deviations), 2)
+    }
+
+@bp.route("/businesses/<int:biz_id>/price-history", methods=["GET"])
+def get_price_history(biz_id):
+    """Price history from the raw event log (resolution=raw) or its day/week rollups"""
+    resolution = request.args.get("resolution", "auto")
+    service_name = request.args.get("service")
+    try:
+        end = datetime.date.fromisoformat(request.args["to"]) if request.args.get("to") else datetime.datetime.utcnow().date()
+        start = datetime.date.fromisoformat(request.args["from"]) if request.args.get("from") else end - datetime.timedelta(days=PRICE_HISTORY_DAYS)
+    except ValueError:
+        return jsonify({"error": "from and to must be dates (YYYY-MM-DD)"}), 400
+    if start > end:
+        return jsonify({"error": "from must not be after to"}), 400
+    
+    if resolution == "auto":
+        resolution = "day" if (end - start).days <= PRICE_HISTORY_DAILY_MAX_DAYS else "week"
+    if resolution != "raw" and resolution not in PRICE_HISTORY_ROLLUPS:
+        return jsonify({"error": "resolution must be one of auto, raw, day, week"}), 400
+    
+    with get_db() as conn:
+        business = conn.execute(
+            "SELECT name, category, location, category_id, location_id FROM businesses WHERE id = ?", (biz_id,)
+        ).fetchone()
+        if not business:
+            return jsonify({"error": "Business not found"}), 404
+        
+        service_condition, service_params = ("AND service_name = ?", [service_name]) if service_name else ("", [])
+        if resolution == "raw":
+            rows = conn.execute(
+                f"""
+                SELECT recorded_at, service_name, price
+                FROM price_events
+                WHERE business_id = ? AND recorded_at >= ? AND recorded_at < ? {service_condition}
+                ORDER BY recorded_at, id
+                LIMIT ?
+                """,
+                [biz_id, start.isoformat(), (end + datetime.timedelta(days=1)).isoformat()] + service_params + [PRICE_HISTORY_RAW_LIMIT]
+            ).fetchall()
+            price_history = [{
+                "date": row["recorded_at"],
+                "service_name": row["service_name"],
+                "price": row["price"],
+                "demand": None,
+                "revenue": None
+            } for row in rows]
+        else:
+            if resolution == "week":
+                # Include the week the range starts in
+                start -= datetime.timedelta(days=start.weekday())
+            rows = conn.execute(
+                f"""
+                SELECT bucket, service_name, open_price, close_price, min_price, max_price, price_sum, event_count
+                FROM {PRICE_HISTORY_ROLLUPS[resolution]}
+                WHERE business_id = ? AND bucket BETWEEN ? AND ? {service_condition}
+                ORDER BY bucket, service_name
+                """,
+                [biz_id, start.isoformat(), end.isoformat()] + service_params
+            ).fetchall()
+            price_history = [{
+                "date": row["bucket"],
+                "service_name": row["service_name"],
+                "price": round(row["price_sum"] / row["event_count"], 2),
+                "open": row["open_price"],
+                "close": row["close_price"],
+                "min": row["min_price"],
+                "max": row["max_price"],
+                "changes": row["event_count"],
+                "demand": None,
+                "revenue": None
+            } for row in rows]
+        
+        optimal_price_range = None
+        if service_name:
+            stats = conn.execute(
+                "SELECT p25_price, p75_price FROM market_price_stats WHERE category_id = ? AND location_id = ? AND service_name = ?",
+                (business["category_id"], business["location_id"] or 0, service_name)
+            ).fetchone()
+            if stats:
+                optimal_price_range = f"${stats['p25_price']:.0f}-${stats['p75_price']:.0f}"
+    
+    return jsonify({
+        "business_name": business["name"],
+        "category": business["category"],
+        "resolution": resolution,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "price_history": price_history,
+        "trends": {
+            **price_trends(price_history),
+            # Bookings are not recorded, so there is no demand or revenue series
+            "revenue_trend": None,
+            "optimal_price_range": optimal_price_range,
+            "revenue_optimization": None
+        }
+    }), 200
+
+@bp.route("/businesses/<int:biz_id>/pricing-simulation", methods=["POST"])
+@require_auth
+def simulate_pricing(biz_id):
+    """Simulate a year of revenue for a candidate dynamic pricing config (default: the saved one)"""
+    data = request.get_json(silent=True) or {}
+    scenarios = data.get("scenarios", pricing_simulator.DEFAULT_SCENARIOS)
+    if not isinstance(scenarios, int) or not 1 <= scenarios <= pricing_simulator.MAX_SCENARIOS:
+        return jsonify({"error": f"scenarios must be between 1 and {pricing_simulator.MAX_SCENARIOS}"}), 400
+    seed = data.get("seed")
+    if seed is not None and not isinstance(seed, int):
+        return jsonify({"error": "seed must be an integer"}), 400
+    
+    with get_db() as conn:
+        business = conn.execute(
+            "SELECT owner_id, category_id, location_id, rating, dynamic_pricing_config FROM businesses WHERE id = ?",
+            (biz_id,)
+        ).fetchone()
+        
+        if not business:
+            return jsonify({"error": "Business not found"}), 404
+        
+        if business["owner_id"] != request.user_id:
+            return jsonify({"error": "Unauthorized"}), 403
+        
+        config = data.get("config")
+        if config is None:
+            config = json.loads(business["dynamic_pricing_config"] or "{}")
+        error = dynamic_pricing.validate_config(config)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        services = conn.execute(
+            """
+            SELECT sp.service_name, sp.current_price, m.p50_price
+            FROM service_pricing sp
+            LEFT JOIN market_price_stats m
+                ON m.category_id = ? AND m.location_id = ? AND m.service_name = sp.service_name
+            WHERE sp.business_id = ? AND sp.current_price > 0
+            ORDER BY sp.service_name
+            """,
+            (business["category_id"], business["location_id"] or 0, biz_id)
+        ).fetchall()
+        open_intervals = conn.execute(
+            "SELECT start_minute, end_minute FROM business_open_intervals WHERE business_id = ?",
+            (biz_id,)
+        ).fetchall()
+    
+    if not services:
+        return jsonify({"error": "Business has no priced services to simulate"}), 400
+    
+    try:
+        start = parse_local_time(data.get("start"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid start, expected an ISO datetime"}), 400
+    
+    result = pricing_simulator.simulate_revenue(
+        [tuple(row) for row in services],
+        config,
+        business["rating"],
+        [tuple(row) for row in open_intervals],
+        start.replace(tzinfo=None),
+        scenarios=scenarios,
+        seed=seed
+    )
+    return jsonify({"business_id": biz_id, "start": start.isoformat(), **result}), 200
+
+def review_to_dict(row):
+    return {
+        "id": row["id"],
+        "businessId": row["business_id"],
+        "name": row["name"],
+        "rating": row["rating"],
+        "text": row["text"],
+        "createdAt": row["created_at"]
+    }
+
+def encode_review_cursor(row):
+    payload = json.dumps([row["created_at"], row["id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+def decode_review_cursor(cursor):
+    try:
+        created_at, review_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), int(review_id)
+    except Exception:
+        return None
+
+@bp.route("/reviews/<int:business_id>", methods=["GET"])
+def get_business_reviews(business_id):
+    """List reviews for a business, newest first.
+
+    Pass ?cursor=<next_cursor> (empty for the first page) for keyset paging,
+    which costs the same on every page; ?page= keeps the OFFSET behaviour.
+    """
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+    cursor = request.args.get("cursor")
+
+    with get_db() as conn:
+        stats = conn.execute(
+            "SELECT review_count FROM business_rating_stats WHERE business_id = ?",
+            (business_id,)
+        ).fetchone()
+        total = stats["review_count"] if stats else 0
+
+        # Both modes walk the covering idx_reviews_business_page; fetch one extra row to know if more follow
+        if cursor is not None:
+            position = decode_review_cursor(cursor) if cursor else None
+            if cursor and position is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+            if position:
+                rows = conn.execute(
+                    """
+                    SELECT id, business_id, name, rating, text, created_at
+                    FROM reviews
+                    WHERE business_id = ? AND (created_at, id) < (?, ?)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                    """,
+                    (business_id, position[0], position[1], limit + 1)
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    """
+                    SELECT id, business_id, name, rating, text, created_at
+                    FROM reviews
+                    WHERE business_id = ?
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT ?
+                    """,
+                    (business_id, limit + 1)
+                ).fetchall()
+            page = None
+        else:
+            page = max(request.args.get("page", 1, type=int), 1)
+            rows = conn.execute(
+                """
+                SELECT id, business_id, name, rating, text, created_at
+                FROM reviews
+                WHERE business_id = ?
+                ORDER BY created_at DESC, id DESC
+                LIMIT ? OFFSET ?
+                """,
+                (business_id, limit + 1, (page - 1) * limit)
+            ).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = encode_review_cursor(rows[-1]) if has_more else None
+
+    pagination = {
+        "limit": limit,
+        "total": total,
+        "pages": (total + limit - 1) // limit
+    }
+    if page is not None:
+        pagination["page"] = page
+
+    return jsonify({
+        "reviews": [review_to_dict(row) for row in rows],
+        "pagination": pagination,
+        "next_cursor": next_cursor
+    }), 200
+
+@bp.route("/reviews/average/<int:business_id>", methods=["GET"])
+def get_business_average_rating(business_id):
+    """Average rating and star distribution from the running aggregates (single primary-key read)"""
+    with get_db() as conn:
+        stats = conn.execute(
+            "SELECT * FROM business_rating_stats WHERE business_id = ?",
+            (business_id,)
+        ).fetchone()
+
+    if not stats or not stats["review_count"]:
+        return jsonify({
+            "averageRating": 0,
+            "totalReviews": 0,
+            "businessId": business_id,
+            "distribution": {str(star): 0 for star in range(1, 6)}
+        }), 200
+
+    return jsonify({
+        "averageRating": round(stats["rating_sum"] / stats["review_count"], 1),
+        "totalReviews": stats["review_count"],
+        "businessId": business_id,
+        "distribution": {str(star): stats[f"stars_{star}"] for star in range(1, 6)}
+    }), 200
+
+@bp.route("/market/price-comparison", methods=["GET"])
+def market_price_comparison():
+    """Market price overview for a category and location, read from market_price_stats"""
+    category = request.args.get("category", "")
+    location = request.args.get("location", "")
+    business_id = request.args.get("business_id", type=int)
+    if not category:
+        return jsonify({"error": "category is required"}), 400
+    
+    with get_db() as conn:
+        # Markets are keyed by dimension ids: the category, and the city of the location (0 for none)
+        category_ids = dimension_ids(conn, "categories", [category])
+        area = location_area(location) or location.strip()
+        location_ids = dimension_ids(conn, "locations", [area]) if area else [0]
+        stats, competitors = [], []
+        if category_ids and location_ids:
+            category_id, location_id = category_ids[0], location_ids[0]
+            category = dimension_names(conn, "categories", [category_id])[0]
+            if location_id:
+                location = dimension_names(conn, "locations", [location_id])[0]
+            # Primary key prefix lookup on (category_id, location_id)
+            stats = conn.execute(
+                "SELECT * FROM market_price_stats WHERE category_id = ? AND location_id = ? ORDER BY service_name",
+                (category_id, location_id)
+            ).fetchall()
+            competitors = conn.execute(
+                """
+                SELECT id, name, category, location, service_pricing, market_position
+                FROM businesses
+                WHERE category_id = ? AND location_id IS ? AND id IS NOT ?
+                LIMIT ?
+                """,
+                (category_id, location_id or None, business_id, PRICE_COMPARISON_LIMIT)
+            ).fetchall()
+        business = conn.execute(
+            "SELECT id, name, rating, total_reviews FROM businesses WHERE id = ?", (business_id,)
+        ).fetchone() if business_id else None
+        business_prices = {
+            row["service_name"]: row["current_price"] for row in conn.execute(
+                "SELECT service_name, current_price FROM service_pricing WHERE business_id = ?", (business_id,)
+            )
+        } if business else {}
+    
+    service_stats = [{
+        "service_name": row["service_name"],
+        "count": row["sample_count"],
+        "mean": row["mean_price"],
+        "p25": row["p25_price"],
+        "median": row["p50_price"],
+        "p75": row["p75_price"],
+        "min": row["min_price"],
+        "max": row["max_price"]
+    } for row in stats]
+    
+    total_samples = sum(row["sample_count"] for row in stats)
+    average_price = sum(row["mean_price"] * row["sample_count"] for row in stats) / total_samples if total_samples else 0
+    
+    # Position the business by its prices relative to each service's market median
+    ratios = [
+        business_prices[row["service_name"]] / row["p50_price"]
+        for row in stats
+        if business_prices.get(row["service_name"]) and row["p50_price"]
+    ]
+    market_position = "competitive"
+    if ratios:
+        average_ratio = sum(ratios) / len(ratios)
+        if average_ratio > 1.1:
+            market_position = "premium"
+        elif average_ratio < 0.9:
+            market_position = "budget"
+    
+    comparison_data = []
+    for competitor in competitors:
+        try:
+            current_pricing = json.loads(competitor["service_pricing"] or "{}")
+        except Exception:
+            current_pricing = {}
+        comparison_data.append({
+            "name": competitor["name"],
+            "category": competitor["category"],
+            "location": competitor["location"],
+            "current_pricing": current_pricing,
+            "pricing_strategy": competitor["market_position"]
+        })
+    
+    response = {
+        "category": category,
+        "location": location,
+        "comparison_data": comparison_data,
+        "service_stats": service_stats,
+        "market_average": {
+            "average_price": round(average_price, 2),
+            "price_range": f"${min(row['min_price'] for row in stats):.0f}-${max(row['max_price'] for row in stats):.0f}" if stats else "N/A",
+            "market_position": market_position
+        }
+    }
+    if business:
+        response["business_context"] = {
+            "business_name": business["name"],
+            "business_rating": business["rating"],
+            "business_reviews": business["total_reviews"],
+            "market_position": market_position
+        }
+    return jsonify(response), 200
+
 @bp.route("/auth/register", methods=["POST"])
 def register():
     """Register a new user"""
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Columnar snapshot of the filterable business attributes for search.
+
+id, category and location ids (businesses.category_id / location_id,
+-1 when unresolved), average rating, review count, latitude/longitude and
+a name sort rank are written
+as .npy columns under SEARCH_SNAPSHOT_DIR and memory-mapped read-only by
+every worker, so N workers share one copy through the page cache.
+Businesses changed since the snapshot (businesses.search_revision) are
+held in a small in-process delta that supersedes their snapshot rows,
+and deleted businesses (deleted_businesses) are dropped through it.
+Until a snapshot exists, and once the delta passes
+snapshot_store.DELTA_LIMIT rows, a daemon thread writes a new snapshot
+outside the request path; it is swapped in on the next refresh.
+
+Filters and sorts then run as NumPy masks and argpartition, and SQLite
+only hydrates the final page of ids:
+
+    python search_snapshot.py --rebuild
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+import snapshot_store
+from db import DB_PATH
+
+SNAPSHOT_DIR = os.environ.get("SEARCH_SNAPSHOT_DIR", "search_index")
+META_FILE = "columns_meta.json"
+# Bumped when the column layout changes, so older snapshots are rebuilt
+COLUMNS_VERSION = 2
+# Names sort by their first bytes (UTF-8 byte order, like SQLite's BINARY collation)
+NAME_KEY_BYTES = 48
+
+COLUMNS = {
+    "id": np.int64,
+    "category": np.int32,
+    "location": np.int32,
+    "rating": np.float64,
+    "reviews": np.int32,
+    "latitude": np.float32,
+    "longitude": np.float32,
+    "name_rank": np.float64,
+}
+
+_ROWS_QUERY = """
+    SELECT b.id, b.name, COALESCE(b.category_id, -1), COALESCE(b.location_id, -1), b.latitude, b.longitude,
+           COALESCE(CAST(s.rating_sum AS REAL) / NULLIF(s.review_count, 0), 0),
+           COALESCE(s.review_count, 0),
+           b.search_revision
+    FROM businesses b
+    LEFT JOIN business_rating_stats s ON s.business_id = b.id
+    WHERE b.search_revision > ?
+"""
+
+_DELETED_QUERY = "SELECT id, search_revision FROM deleted_businesses WHERE search_revision > ?"
+
+def name_key(name):
+    return (name or "").encode("utf-8")[:NAME_KEY_BYTES]
+
+def _row_columns(rows):
+    """Column arrays for (id, name, category_id, location_id, lat, lng, rating, reviews, revision) rows"""
+    return {
+        "id": np.array([row[0] for row in rows], dtype=np.int64),
+        "category": np.array([row[2] for row in rows], dtype=np.int32),
+        "location": np.array([row[3] for row in rows], dtype=np.int32),
+        "rating": np.array([row[6] for row in rows], dtype=np.float64),
+        "reviews": np.array([row[7] for row in rows], dtype=np.int32),
+        "latitude": np.array([np.nan if row[4] is None else row[4] for row in rows], dtype=np.float32),
+        "longitude": np.array([np.nan if row[5] is None else row[5] for row in rows], dtype=np.float32),
+    }
+
+# Every file of a snapshot: the columns plus the name index used to rank delta rows
+PARTS = list(COLUMNS) + ["sorted_names"]
+
+def read_meta(snapshot_dir):
+    return snapshot_store.read_meta(snapshot_dir, META_FILE, version=COLUMNS_VERSION)
+
+def rebuild_snapshot(conn, snapshot_dir=SNAPSHOT_DIR):
+    """Write every business into a fresh snapshot; returns the number of rows"""
+    rows = conn.execute(_ROWS_QUERY, (-1,)).fetchall()
+    columns = _row_columns(rows)
+
+    keys = np.array([name_key(row[1]) for row in rows], dtype=f"S{NAME_KEY_BYTES}")
+    order = np.lexsort((columns["id"], keys))
+    name_rank = np.empty(len(rows), dtype=np.float64)
+    name_rank[order] = np.arange(len(rows))
+    columns["name_rank"] = name_rank
+    columns["sorted_names"] = keys[order]
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    revision = max((row[8] or 0 for row in rows), default=0)
+    # Unique per write: a file this process still maps must never be overwritten in place
+    base = f"columns-{revision}-{os.getpid()}-{time.time_ns()}"
+    for name, values in columns.items():
+        np.save(snapshot_store.part_path(snapshot_dir, base, name), values)
+    snapshot_store.publish(
+        snapshot_dir, META_FILE,
+        {"base": base, "revision": revision, "count": len(rows), "version": COLUMNS_VERSION},
+        PARTS
+    )
+    return len(rows)
+
+class SearchSnapshot:
+    def __init__(self, snapshot_dir=SNAPSHOT_DIR):
+        self.snapshot_dir = snapshot_dir
+        self._lock = threading.Lock()
+        self._base = None
+        self._base_revision = -1
+        self._revision = -1
+        self._snapshot = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._sorted_names = np.zeros(0, dtype=f"S{NAME_KEY_BYTES}")
+        self._delta = {}
+        self._view = None
+        self._rebuilding = None
+
+    def _load(self, meta):
+        parts = snapshot_store.load_parts(self.snapshot_dir, meta["base"], PARTS)
+        self._sorted_names = parts.pop("sorted_names")
+        self._snapshot = parts
+        self._base = meta["base"]
+        self._base_revision = meta["revision"]
+        self._revision = meta["revision"]
+        self._delta = {}
+        self._view = None
+
+    def refresh(self, conn):
+        """Pick up a newer snapshot from another worker, then the rows written since"""
+        meta = read_meta(self.snapshot_dir)
+        if meta is None:
+            # Nothing written yet: every row is served from the delta until the rebuild lands
+            self._rebuild_in_background()
+        # A snapshot behind the delta still replaces the base; the rows after it are read again below
+        snapshot_store.load_newer(meta, self._base, self._base_revision, self._load)
+
+        revision = self._revision
+        rows = conn.execute(_ROWS_QUERY, (revision,)).fetchall()
+        for row in rows:
+            self._delta[row[0]] = row
+            self._revision = max(self._revision, row[8] or 0)
+        # A deleted business keeps a None entry so its snapshot row is filtered out
+        deleted = conn.execute(_DELETED_QUERY, (revision,)).fetchall()
+        for business_id, deleted_revision in deleted:
+            self._delta[business_id] = None
+            self._revision = max(self._revision, deleted_revision)
+        if rows or deleted:
+            self._view = None
+
+        if len(self._delta) > snapshot_store.DELTA_LIMIT:
+            self._rebuild_in_background()
+
+    def _rebuild_in_background(self):
+        """Write a fresh snapshot on a daemon thread, at most one at a time per process"""
+        if self._rebuilding is not None and self._rebuilding.is_alive():
+            return
+
+        def rebuild():
+            try:
+                conn = sqlite3.connect(DB_PATH)
+                try:
+                    rebuild_snapshot(conn, self.snapshot_dir)
+                finally:
+                    conn.close()
+            except Exception as e:
+                print(f"Search snapshot rebuild error: {e}")
+
+        self._rebuilding = threading.Thread(target=rebuild, name="search-snapshot-rebuild", daemon=True)
+        self._rebuilding.start()
+
+    def view(self, conn):
+        """Refresh and return the current columns (snapshot rows merged with the delta)"""
+        with self._lock:
+            self.refresh(conn)
+            if self._view is None:
+                self._view = self._merge()
+            return self._view
+
+    def _merge(self):
+        if not self._delta:
+            return SnapshotView(self._snapshot)
+
+        changed = np.fromiter(self._delta.keys(), dtype=np.int64, count=len(self._delta))
+        rows = [row for row in self._delta.values() if row is not None]
+        delta = _row_columns(rows)
+        # Slot each changed name between the snapshot names around it, in name order among themselves
+        keys = np.array([name_key(row[1]) for row in rows], dtype=f"S{NAME_KEY_BYTES}")
+        positions = np.searchsorted(self._sorted_names, keys, side="left")
+        within = np.empty(len(rows), dtype=np.float64)
+        within[np.lexsort((delta["id"], keys))] = np.arange(len(rows))
+        delta["name_rank"] = positions - 1 + (within + 1) / (len(rows) + 1)
+
+        keep = ~np.isin(self._snapshot["id"], changed)
+        columns = {name: np.concatenate([self._snapshot[name][keep], delta[name]]) for name in COLUMNS}
+        return SnapshotView(columns)
+
+class SnapshotView:
+    """Immutable set of columns that search requests filter and sort"""
+
+    SORT_KEYS = {"name": "name_rank", "rating": "rating", "recent": "id", "distance": "id"}
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._id_order = None
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def mask(self, category_ids=None, location_ids=None, min_rating=None, max_rating=None, ids=None):
+        mask = np.ones(len(self), dtype=bool)
+        if category_ids is not None:
+            mask &= np.isin(self.columns["category"], category_ids)
+        if location_ids is not None:
+            mask &= np.isin(self.columns["location"], location_ids)
+        if min_rating is not None:
+            mask &= self.columns["rating"] >= min_rating
+        if max_rating is not None:
+            mask &= self.columns["rating"] <= max_rating
+        if ids is not None:
+            mask &= np.isin(self.columns["id"], ids)
+        return mask
+
+    def positions(self, ids):
+        """Row positions of ids (which must all be present)"""
+        if self._id_order is None:
+            self._id_order = np.argsort(self.columns["id"], kind="stable")
+        sorted_ids = self.columns["id"][self._id_order]
+        return self._id_order[np.searchsorted(sorted_ids, ids)]
+
+    def page(self, mask, sort_values, descending, offset, limit):
+        """Row positions of one page of the masked rows, sorted by sort_values then id"""
+        candidates = np.flatnonzero(mask)
+        if not len(candidates) or offset >= len(candidates):
+            return np.zeros(0, dtype=np.int64)
+        values = np.asarray(sort_values[candidates], dtype=np.float64)
+        ids = self.columns["id"][candidates]
+        if descending:
+            values, ids = -values, -ids
+
+        # Only rows that can land on this page are fully sorted
+        end = min(offset + limit, len(candidates))
+        if end < len(candidates):
+            cutoff = np.partition(values, end - 1)[end - 1]
+            near = np.flatnonzero(values <= cutoff)
+            candidates, values, ids = candidates[near], values[near], ids[near]
+        order = np.lexsort((ids, values))
+        return candidates[order[offset:end]]
+
+_snapshot = SearchSnapshot()
+
+def search_view(conn):
+    """Columns from the shared per-process snapshot"""
+    return _snapshot.view(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the columnar search snapshot")
+    parser.add_argument("--rebuild", action="store_true", help="write every business into a fresh snapshot")
+    args = parser.parse_args()
+
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    with sqlite3.connect(DB_PATH) as conn:
+        print(f"✅ Wrote {rebuild_snapshot(conn)} businesses into {SNAPSHOT_DIR}/.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Offline semantic search over business text.
+
+Business name, category, description and services are embedded with a
+deterministic hashed embedding: each word contributes its own feature,
+its character trigrams (so "nail" and "nails" or misspellings land close)
+and any concept it belongs to in CONCEPTS (so "nails" and "manicure"
+share a direction). Features are signed-hashed into EMBEDDING_DIM floats
+and L2-normalized, so a dot product is a cosine similarity.
+
+Vectors live in a float32 memory-mapped snapshot under SEMANTIC_INDEX_DIR
+that every worker maps read-only. Rows written since the snapshot (found
+through businesses.text_revision) are embedded into a small in-process
+delta that overrides the snapshot; once it grows past
+snapshot_store.DELTA_LIMIT a new snapshot is written and atomically
+swapped in. Queries are a brute-force
+matrix-vector product plus argpartition:
+
+    python semantic_index.py --rebuild
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import zlib
+
+import numpy as np
+
+import snapshot_store
+from db import DB_PATH
+
+EMBEDDING_DIM = 256
+INDEX_DIR = os.environ.get("SEMANTIC_INDEX_DIR", "search_index")
+META_FILE = "semantic_meta.json"
+PARTS = ("ids", "f32")
+BUILD_BATCH_SIZE = 5000
+
+WORD_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.6
+CONCEPT_WEIGHT = 2.0
+# Cosine similarity below this is hash-collision noise rather than a match
+MIN_SIMILARITY = 0.1
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "our", "the", "to", "we", "with", "you", "your",
+}
+
+# Word stems that mean the same thing to someone searching for a business
+CONCEPTS = {
+    "nails": ["nail", "manicur", "pedicur", "polish", "acrylic"],
+    "hair": ["hair", "haircut", "barber", "stylist", "blowout", "braid", "shave", "beard"],
+    "beauty": ["beauty", "makeup", "cosmetic", "facial", "skincare", "lash", "brow", "wax"],
+    "spa": ["spa", "massage", "sauna", "relax", "wellness"],
+    "fitness": ["gym", "fitness", "workout", "training", "trainer", "yoga", "pilates", "crossfit"],
+    "food": ["restaurant", "food", "dining", "meal", "cuisine", "bistro", "grill", "pizza",
+             "burger", "sushi", "kitchen", "eat"],
+    "coffee": ["coffee", "cafe", "espresso", "latte", "cappuccino"],
+    "bakery": ["bakery", "bread", "pastry", "pastries", "cake", "croissant"],
+    "auto": ["car", "auto", "vehicle", "mechanic", "tire", "tyre", "garage"],
+    "dental": ["dental", "dentist", "teeth", "tooth", "orthodont"],
+    "medical": ["doctor", "clinic", "medical", "physician", "health"],
+    "pets": ["pet", "dog", "cat", "vet", "groom", "puppy"],
+    "cleaning": ["clean", "laundry", "maid", "housekeep"],
+}
+_CONCEPT_STEMS = sorted(
+    ((stem, concept) for concept, stems in CONCEPTS.items() for stem in stems),
+    key=lambda item: -len(item[0])
+)
+
+def _add_feature(vector, feature, weight):
+    h = zlib.crc32(feature.encode("utf-8"))
+    vector[h % EMBEDDING_DIM] += weight if (h >> 31) & 1 else -weight
+
+def _word_concepts(word):
+    return {concept for stem, concept in _CONCEPT_STEMS if word.startswith(stem)}
+
+def embed(text):
+    """Unit-length float32 embedding of a piece of text (all zeros if it has no words)"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float64)
+    for word in TOKEN_RE.findall((text or "").lower()):
+        if word in STOPWORDS:
+            continue
+        _add_feature(vector, "w:" + word, WORD_WEIGHT)
+        padded = f"<{word}>"
+        trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        for trigram in trigrams:
+            _add_feature(vector, "t:" + trigram, TRIGRAM_WEIGHT / np.sqrt(len(trigrams)))
+        for concept in _word_concepts(word):
+            _add_feature(vector, "c:" + concept, CONCEPT_WEIGHT)
+    norm = np.linalg.norm(vector)
+    return (vector / norm if norm else vector).astype(np.float32)
+
+def business_text(name, category, description, services):
+    return " ".join(part for part in (name, category, description, services) if part)
+
+_TEXT_QUERY = """
+    SELECT id, name, category, description, services, text_revision
+    FROM businesses
+    WHERE text_revision > ?
+    ORDER BY text_revision
+"""
+
+def write_snapshot(index_dir, ids, vectors, revision):
+    """Write ids/vectors as a new snapshot and point the meta file at it"""
+    os.makedirs(index_dir, exist_ok=True)
+    base = f"semantic-{revision}-{os.getpid()}"
+    np.save(snapshot_store.part_path(index_dir, base, "ids"), np.asarray(ids, dtype=np.int64))
+    matrix = np.lib.format.open_memmap(
+        snapshot_store.part_path(index_dir, base, "f32"), mode="w+", dtype=np.float32,
+        shape=(len(ids), EMBEDDING_DIM)
+    )
+    matrix[:] = vectors
+    matrix.flush()
+    del matrix
+    snapshot_store.publish(
+        index_dir, META_FILE,
+        {"base": base, "revision": revision, "count": len(ids), "dim": EMBEDDING_DIM},
+        PARTS
+    )
+
+def read_meta(index_dir):
+    return snapshot_store.read_meta(index_dir, META_FILE, dim=EMBEDDING_DIM)
+
+def rebuild_snapshot(conn, index_dir=INDEX_DIR):
+    """Embed every business into a fresh snapshot; returns the number of rows"""
+    ids, vectors, revision = [], [], 0
+    cursor = conn.execute(_TEXT_QUERY, (-1,))
+    while True:
+        rows = cursor.fetchmany(BUILD_BATCH_SIZE)
+        if not rows:
+            break
+        for business_id, name, category, description, services, row_revision in rows:
+            ids.append(business_id)
+            vectors.append(embed(business_text(name, category, description, services)))
+            revision = max(revision, row_revision or 0)
+    matrix = np.vstack(vectors) if vectors else np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+    write_snapshot(index_dir, ids, matrix, revision)
+    return len(ids)
+
+class SemanticIndex:
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self._lock = threading.Lock()
+        self._base = None
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._vectors = np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        self._revision = -1
+        self._delta = {}
+
+    def _load_snapshot(self, meta):
+        # Both files are loaded before touching the index, so a snapshot removed halfway leaves the old one intact
+        parts = snapshot_store.load_parts(self.index_dir, meta["base"], PARTS)
+        self._ids, self._vectors = parts["ids"], parts["f32"]
+        self._base = meta["base"]
+        self._revision = meta["revision"]
+        self._delta = {}
+
+    def refresh(self, conn):
+        """Pick up a newer snapshot from another worker, then embed rows written since"""
+        meta = read_meta(self.index_dir)
+        if meta is None:
+            rebuild_snapshot(conn, self.index_dir)
+            meta = read_meta(self.index_dir)
+        snapshot_store.load_newer(meta, self._base, self._revision, self._load_snapshot)
+
+        for business_id, name, category, description, services, revision in conn.execute(_TEXT_QUERY, (self._revision,)):
+            self._delta[business_id] = embed(business_text(name, category, description, services))
+            self._revision = max(self._revision, revision or 0)
+
+        if len(self._delta) > snapshot_store.DELTA_LIMIT:
+            ids, vectors = self._merged()
+            write_snapshot(self.index_dir, ids, vectors, self._revision)
+            snapshot_store.load_newer(read_meta(self.index_dir), self._base, self._revision, self._load_snapshot)
+
+    def _delta_ids(self):
+        return np.fromiter(self._delta.keys(), dtype=np.int64, count=len(self._delta))
+
+    def _merged(self):
+        keep = ~np.isin(self._ids, self._delta_ids())
+        ids = np.concatenate([self._ids[keep], self._delta_ids()])
+        vectors = np.vstack([self._vectors[keep]] + list(self._delta.values()))
+        return ids, vectors
+
+    def search(self, conn, query, limit):
+        """Top (business_id, cosine similarity) matches for a free-text query"""
+        query_vector = embed(query)
+        if not query_vector.any():
+            return []
+        with self._lock:
+            self.refresh(conn)
+            scores = np.asarray(self._vectors @ query_vector)
+            if self._delta:
+                delta_ids = self._delta_ids()
+                # Rows in the delta supersede their snapshot copies
+                scores[np.isin(self._ids, delta_ids)] = -np.inf
+                ids = np.concatenate([self._ids, delta_ids])
+                scores = np.concatenate([scores, np.vstack(list(self._delta.values())) @ query_vector])
+            else:
+                ids = self._ids
+
+        if len(scores) > limit:
+            top = np.argpartition(-scores, limit)[:limit]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] >= MIN_SIMILARITY]
+
+_index = SemanticIndex()
+
+def semantic_search(conn, query, limit):
+    """Matches from the shared per-process index"""
+    return _index.search(conn, query, limit)
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the semantic search snapshot")
+    parser.add_argument("--rebuild", action="store_true", help="embed every business into a fresh snapshot")
+    parser.add_argument("--query", help="print the top matches for a query")
+    args = parser.parse_args()
+
+    with sqlite3.connect(DB_PATH) as conn:
+        if args.rebuild:
+            print(f"✅ Embedded {rebuild_snapshot(conn)} businesses into {INDEX_DIR}/.")
+        if args.query:
+            for business_id, score in semantic_search(conn, args.query, 10):
+                print(f"  {score:.3f}  business {business_id}")
+        if not args.rebuild and not args.query:
+            parser.print_help()
+
+if __name__ == "__main__":
+    main()
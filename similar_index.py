@@ -0,0 +1,175 @@
+"""
+Local "businesses like this one" index.
+
+Each business's name, category, description and services are tokenized
+and hashed into a fixed feature space (no vocabulary to maintain), and
+scored with TF-IDF cosine similarity over an inverted index held in NumPy
+arrays. Documents and document frequencies are updated incrementally
+from rows whose businesses.text_revision moved past the last one seen,
+and deleted businesses are dropped through deleted_businesses. Postings
+are sorted once into a base; businesses changed since then are scored
+from a small delta that supersedes their base rows, and the base is
+rebuilt (with fresh idf) once the delta grows past DELTA_LIMIT.
+"""
+
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from snapshot_store import DELTA_LIMIT
+
+FEATURE_BITS = 20
+FEATURE_MASK = (1 << FEATURE_BITS) - 1
+# Sharing a category counts like this many shared words
+CATEGORY_WEIGHT = 3.0
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "our", "the", "to", "we", "with", "you", "your",
+}
+
+def _feature(token):
+    return zlib.crc32(token.encode("utf-8")) & FEATURE_MASK
+
+def document_features(name, category, description, services):
+    """(feature ids, sublinear term weights) for one business"""
+    counts = {}
+    text = " ".join(part for part in (name, description, services) if part)
+    for token in TOKEN_RE.findall(text.lower()):
+        if len(token) > 1 and token not in STOPWORDS:
+            feature = _feature(token)
+            counts[feature] = counts.get(feature, 0) + 1
+    weights = {feature: 1.0 + np.log(count) for feature, count in counts.items()}
+    if category:
+        feature = _feature("category:" + category.lower())
+        weights[feature] = weights.get(feature, 0.0) + CATEGORY_WEIGHT
+
+    features = np.fromiter(weights.keys(), dtype=np.int64, count=len(weights))
+    values = np.fromiter(weights.values(), dtype=np.float64, count=len(weights))
+    return features, values
+
+def _postings(docs, idf):
+    """Feature-sorted postings (features, doc rows, idf weights) and doc norms for a list of (features, values)"""
+    lengths = np.array([len(features) for features, _ in docs], dtype=np.int64)
+    all_features = np.concatenate([features for features, _ in docs]) if docs else np.zeros(0, dtype=np.int64)
+    all_values = np.concatenate([values for _, values in docs]) if docs else np.zeros(0)
+    rows = np.repeat(np.arange(len(docs)), lengths)
+    weighted = all_values * idf[all_features]
+    norms = np.sqrt(np.bincount(rows, weights=weighted ** 2, minlength=len(docs)))
+    order = np.argsort(all_features, kind="stable")
+    return all_features[order], rows[order], weighted[order], norms
+
+def _scores(postings, features, query):
+    """Cosine scores of every doc in postings against an idf-weighted, unit-length query"""
+    posting_features, posting_rows, posting_weights, norms = postings
+    # Only the postings of the query's own features are touched
+    starts = np.searchsorted(posting_features, features, side="left")
+    ends = np.searchsorted(posting_features, features, side="right")
+    lengths = ends - starts
+    positions = np.repeat(ends - lengths.cumsum(), lengths) + np.arange(lengths.sum())
+    scores = np.bincount(
+        posting_rows[positions],
+        weights=posting_weights[positions] * np.repeat(query, lengths),
+        minlength=len(norms)
+    )
+    return scores / np.where(norms > 0, norms, 1.0)
+
+class SimilarityIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revision = -1
+        self._docs = {}
+        self._doc_freq = np.zeros(1 << FEATURE_BITS, dtype=np.int64)
+        self._base = None
+        # Businesses changed or deleted since the base postings were built
+        self._changed = set()
+        self._delta = None
+
+    def refresh(self, conn):
+        """Fold in businesses written or deleted since the last refresh; returns how many changed"""
+        rows = conn.execute(
+            """
+            SELECT id, name, category, description, services, text_revision
+            FROM businesses
+            WHERE text_revision > ?
+            ORDER BY text_revision
+            """,
+            (self._revision,)
+        ).fetchall()
+        deleted = conn.execute(
+            "SELECT id, text_revision FROM deleted_businesses WHERE text_revision > ?",
+            (self._revision,)
+        ).fetchall()
+        for business_id, name, category, description, services, revision in rows:
+            old = self._docs.get(business_id)
+            if old is not None:
+                self._doc_freq[old[0]] -= 1
+            features = document_features(name, category, description, services)
+            self._doc_freq[features[0]] += 1
+            self._docs[business_id] = features
+            self._changed.add(business_id)
+            self._revision = max(self._revision, revision or 0)
+        for business_id, revision in deleted:
+            old = self._docs.pop(business_id, None)
+            if old is not None:
+                self._doc_freq[old[0]] -= 1
+                self._changed.add(business_id)
+            self._revision = max(self._revision, revision)
+        if rows or deleted:
+            self._delta = None
+        return len(rows) + len(deleted)
+
+    def _build(self):
+        """Sort every document's postings and freeze idf; later changes go to the delta"""
+        self._idf = np.log((1.0 + len(self._docs)) / (1.0 + self._doc_freq)) + 1.0
+        self._base_ids = np.fromiter(self._docs.keys(), dtype=np.int64, count=len(self._docs))
+        self._base = _postings(list(self._docs.values()), self._idf)
+        self._changed = set()
+        self._delta = None
+
+    def _build_delta(self):
+        """Postings of the changed businesses, and which base rows they supersede"""
+        changed = np.fromiter(self._changed, dtype=np.int64, count=len(self._changed))
+        ids = np.array([business_id for business_id in self._changed if business_id in self._docs], dtype=np.int64)
+        postings = _postings([self._docs[int(business_id)] for business_id in ids], self._idf)
+        return ids, postings, np.isin(self._base_ids, changed)
+
+    def similar(self, conn, business_id, limit=DEFAULT_LIMIT):
+        """Top (business_id, score) neighbours of a business, or None if it is unknown"""
+        with self._lock:
+            self.refresh(conn)
+            if business_id not in self._docs:
+                return None
+            # A write only re-sorts the small delta; the base is rebuilt once the delta outgrows it
+            if self._base is None or len(self._changed) > DELTA_LIMIT:
+                self._build()
+            if self._delta is None:
+                self._delta = self._build_delta()
+            delta_ids, delta_postings, superseded = self._delta
+
+            features, values = self._docs[business_id]
+            query = values * self._idf[features]
+            query /= np.linalg.norm(query) or 1.0
+
+            base_scores = _scores(self._base, features, query)
+            base_scores[superseded] = 0.0
+            ids = np.concatenate([self._base_ids, delta_ids])
+            scores = np.concatenate([base_scores, _scores(delta_postings, features, query)])
+            scores[ids == business_id] = 0.0
+
+            candidates = np.flatnonzero(scores > 0)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            return [(int(ids[row]), float(scores[row])) for row in candidates]
+
+_index = SimilarityIndex()
+
+def similar_businesses(conn, business_id, limit=DEFAULT_LIMIT):
+    """Neighbours from the shared per-process index"""
+    return _index.similar(conn, business_id, limit)
@@ -0,0 +1,64 @@
+"""
+Files behind the memory-mapped search snapshots (search_snapshot.py and
+semantic_index.py).
+
+A snapshot is a set of "<base>.<part>.npy" arrays in one directory plus a
+small JSON meta file naming the current base and the revision it covers.
+Writers save every part first and then atomically replace the meta file,
+so readers see either the old snapshot or the new one. Each worker maps
+the parts read-only and keeps rows written since in an in-process delta;
+past DELTA_LIMIT rows a new snapshot is written and published (by a
+background thread for search_snapshot.py).
+"""
+
+import json
+import os
+
+import numpy as np
+
+# Rows kept in an in-process delta before a new snapshot is written
+DELTA_LIMIT = 2000
+
+def part_path(directory, base, part):
+    return os.path.join(directory, f"{base}.{part}.npy")
+
+def read_meta(directory, meta_file, **expected):
+    """The current meta, or None if there is none or it doesn't carry the expected values"""
+    try:
+        with open(os.path.join(directory, meta_file)) as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return meta if all(meta.get(key) == value for key, value in expected.items()) else None
+
+def publish(directory, meta_file, meta, parts):
+    """Point meta_file at the already written parts of meta["base"] and remove the previous snapshot"""
+    meta_path = os.path.join(directory, meta_file)
+    previous = read_meta(directory, meta_file)
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+    # Workers that still map the old files keep them alive until they reopen
+    if previous and previous.get("base") != meta["base"]:
+        for part in parts:
+            try:
+                os.remove(part_path(directory, previous["base"], part))
+            except FileNotFoundError:
+                pass
+
+def load_parts(directory, base, parts):
+    """Memory-map every part of a snapshot; raises FileNotFoundError if it was removed meanwhile"""
+    return {part: np.load(part_path(directory, base, part), mmap_mode="r") for part in parts}
+
+def load_newer(meta, base, revision, load):
+    """Call load(meta) if meta names another snapshot at least as new as (base, revision); returns whether it did"""
+    if meta is None or meta["base"] == base or meta["revision"] < revision:
+        return False
+    try:
+        load(meta)
+    except FileNotFoundError:
+        # Superseded while we were reading the meta file; picked up next time
+        return False
+    return True
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Test script for business image uploads and their shared, reference-counted files
+"""
+
+import requests
+import struct
+import zlib
+
+# Configuration
+BASE_URL = "http://localhost:5000"
+TEST_EMAIL = "images_test@example.com"
+TEST_PASSWORD = "imagestest123"
+
+def get_token():
+    """Register the test user, or log in if it already exists"""
+    credentials = {"email": TEST_EMAIL, "password": TEST_PASSWORD}
+    response = requests.post(f"{BASE_URL}/auth/register", json=credentials)
+    if response.status_code == 409:
+        response = requests.post(f"{BASE_URL}/auth/login", json=credentials)
+    if response.status_code not in (200, 201):
+        print(f"❌ Could not authenticate: {response.status_code}")
+        return None
+    return response.json()["token"]
+
+def png_bytes(seed):
+    """A tiny valid PNG whose single pixel depends on seed, so each run stores new content"""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    pixel = bytes([0, seed % 256, (seed // 256) % 256, (seed // 65536) % 256])
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", 1, 1, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(pixel))
+            + chunk(b"IEND", b""))
+
+def test_cover_survives_gallery_delete():
+    """Delete a gallery image that is also the business cover and check the cover file stays"""
+
+    print("🖼️  Testing Business Images API")
+    print("=" * 50)
+
+    print("1. Authenticating...")
+    token = get_token()
+    if not token:
+        return
+    headers = {"Authorization": f"Bearer {token}"}
+    print("✅ Authenticated")
+
+    print("\n2. Creating a business...")
+    response = requests.post(f"{BASE_URL}/businesses", json={
+        "name": "Image Test Studio",
+        "category": "Photography",
+        "description": "Portraits and product photos",
+        "services": "Portraits",
+        "image_url": "",
+        "location": "Tbilisi"
+    }, headers=headers)
+    if response.status_code != 201:
+        print(f"❌ Could not create business - Status: {response.status_code}")
+        return
+    business_id = response.json()["id"]
+    print(f"✅ Created business {business_id}")
+
+    print("\n3. Uploading an image and making it the cover (as the add page does)...")
+    image = png_bytes(business_id)
+    response = requests.post(
+        f"{BASE_URL}/businesses/{business_id}/images",
+        files={"image": ("cover.png", image, "image/png")},
+        headers=headers
+    )
+    if response.status_code != 201:
+        print(f"❌ Upload failed - Status: {response.status_code}")
+        return
+    image_id, image_url = response.json()["id"], response.json()["image_url"]
+    requests.patch(f"{BASE_URL}/businesses/{business_id}", json={"image_url": image_url}, headers=headers)
+    print(f"✅ Uploaded {image_url}")
+
+    print("\n4. Deleting the gallery image...")
+    response = requests.delete(f"{BASE_URL}/businesses/{business_id}/images/{image_id}", headers=headers)
+    if response.status_code == 200:
+        print("✅ Gallery image deleted")
+    else:
+        print(f"❌ Delete failed - Status: {response.status_code}")
+
+    response = requests.get(f"{BASE_URL}{image_url}")
+    if response.status_code == 200 and response.content == image:
+        print("✅ Cover image is still served")
+    else:
+        print(f"❌ Cover image is gone - Status: {response.status_code}")
+
+    print("\n" + "=" * 50)
+    print("🎉 Business images testing completed!")
+
+if __name__ == "__main__":
+    try:
+        test_cover_survives_gallery_delete()
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to the backend server.")
+        print("   Make sure the Flask backend is running on http://localhost:5000")
+    except Exception as e:
+        print(f"❌ An error occurred: {e}")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the NDJSON bulk import endpoint and its per-line error reporting
+"""
+
+import requests
+import json
+
+# Configuration
+BASE_URL = "http://localhost:5000"
+TEST_EMAIL = "import_test@example.com"
+TEST_PASSWORD = "importtest123"
+
+def get_token():
+    """Register the test user, or log in if it already exists"""
+    credentials = {"email": TEST_EMAIL, "password": TEST_PASSWORD}
+    response = requests.post(f"{BASE_URL}/auth/register", json=credentials)
+    if response.status_code == 409:
+        response = requests.post(f"{BASE_URL}/auth/login", json=credentials)
+    if response.status_code not in (200, 201):
+        print(f"❌ Could not authenticate: {response.status_code}")
+        return None
+    return response.json()["token"]
+
+def test_import_endpoint():
+    """Import a mix of good and bad lines and check every bad line is reported"""
+
+    print("📦 Testing Bulk Import API")
+    print("=" * 50)
+
+    print("1. Authenticating...")
+    token = get_token()
+    if not token:
+        return
+    print("✅ Authenticated")
+
+    business = {
+        "name": "Import Test Bakery",
+        "category": "Bakery",
+        "description": "Fresh bread and pastries every morning",
+        "services": "Bread\nPastries",
+        "location": "12 Rustaveli Ave, Tbilisi, Georgia"
+    }
+    lines = [
+        # line 1: valid
+        json.dumps({**business, "hours": [{"day_of_week": 1, "open_time": "08:00", "close_time": "18:00"}],
+                    "service_pricing": {"Bread": {"current_price": 3.5}}}),
+        # line 2: missing required fields
+        json.dumps({"name": "No Category"}),
+        # line 3: day_of_week as a string
+        json.dumps({**business, "hours": [{"day_of_week": "1"}]}),
+        # line 4: non-numeric price
+        json.dumps({**business, "service_pricing": {"Bread": {"current_price": "abc"}}}),
+        # line 5: not JSON
+        "{not json",
+        # line 6: reviews need an import admin
+        json.dumps({"type": "review", "business_id": 1, "user_id": 1, "rating": 5, "text": "Lovely bread here"}),
+        # line 7: valid
+        json.dumps({**business, "name": "Import Test Bakery 2"}),
+    ]
+    expected_errors = {2, 3, 4, 5, 6}
+
+    print("\n2. Importing 7 lines (2 valid, 5 invalid)...")
+    response = requests.post(
+        f"{BASE_URL}/businesses/import",
+        data="\n".join(lines).encode("utf-8"),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    )
+    if response.status_code != 200:
+        print(f"❌ Import failed - Status: {response.status_code}")
+        return
+    report = response.json()
+
+    if report["businesses"] == 2:
+        print("✅ Both valid businesses were imported")
+    else:
+        print(f"❌ Expected 2 imported businesses, got {report['businesses']}")
+
+    reported = {error["line"] for error in report["errors"]}
+    if reported == expected_errors and report["error_count"] == len(expected_errors):
+        print("✅ Every invalid line was reported on its own")
+    else:
+        print(f"❌ Expected errors on lines {sorted(expected_errors)}, got {sorted(reported)}")
+    for error in report["errors"]:
+        print(f"   line {error['line']}: {error['error']}")
+
+    print("\n3. Importing again on the same server...")
+    response = requests.post(
+        f"{BASE_URL}/businesses/import",
+        data=lines[0].encode("utf-8"),
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    )
+    if response.status_code == 200 and response.json()["businesses"] == 1:
+        print("✅ Follow-up import succeeded")
+    else:
+        print(f"❌ Follow-up import failed - Status: {response.status_code}")
+
+    print("\n" + "=" * 50)
+    print("🎉 Bulk import testing completed!")
+
+if __name__ == "__main__":
+    try:
+        test_import_endpoint()
+    except requests.exceptions.ConnectionError:
+        print("❌ Could not connect to the backend server.")
+        print("   Make sure the Flask backend is running on http://localhost:5000")
+    except Exception as e:
+        print(f"❌ An error occurred: {e}")
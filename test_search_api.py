@@ -99,6 +99,25 @@ def test_search_endpoints():
     else:
         print(f"❌ Pagination failed - Status: {response.status_code}")
     
+    # Test 9: Search modes
+    print("\n9. Testing search modes...")
+    for mode in ("keyword", "semantic", "hybrid"):
+        response = requests.get(f"{BASE_URL}/businesses/search?q=nails&mode={mode}")
+        if response.status_code == 200:
+            data = response.json()
+            relevance = [b.get("relevance", 0) for b in data.get("businesses", [])]
+            ordered = mode == "keyword" or relevance == sorted(relevance, reverse=True)
+            print(f"{'✅' if ordered else '❌'} {mode} search - Found {data.get('pagination', {}).get('total', 0)} results"
+                  f"{'' if ordered else ' (not sorted by relevance)'}")
+        else:
+            print(f"❌ {mode} search failed - Status: {response.status_code}")
+    
+    response = requests.get(f"{BASE_URL}/businesses/search?q=nails&mode=fuzzy")
+    if response.status_code == 400:
+        print("✅ Unknown mode rejected")
+    else:
+        print(f"❌ Unknown mode should be rejected - Status: {response.status_code}")
+    
     print("\n" + "=" * 50)
     print("🎉 Search API testing completed!")
 
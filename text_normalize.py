@@ -0,0 +1,27 @@
+"""
+Search normalization for business text.
+
+Text is folded into one comparable form so matching ignores case, accents
+and script: str.casefold() handles non-ASCII case (Georgian Mtavruli
+capitals included), NFKD decomposition drops combining accents
+("Café" -> "cafe"), and Georgian letters are transliterated to Latin with
+the national romanization minus its apostrophes ("თბილისი" -> "tbilisi"),
+so Georgian and Latin spellings of the same name meet.
+"""
+
+import unicodedata
+
+GEORGIAN_TO_LATIN = {
+    "ა": "a", "ბ": "b", "გ": "g", "დ": "d", "ე": "e", "ვ": "v", "ზ": "z", "თ": "t",
+    "ი": "i", "კ": "k", "ლ": "l", "მ": "m", "ნ": "n", "ო": "o", "პ": "p", "ჟ": "zh",
+    "რ": "r", "ს": "s", "ტ": "t", "უ": "u", "ფ": "p", "ქ": "k", "ღ": "gh", "ყ": "q",
+    "შ": "sh", "ჩ": "ch", "ც": "ts", "ძ": "dz", "წ": "ts", "ჭ": "ch", "ხ": "kh", "ჯ": "j",
+    "ჰ": "h",
+}
+_TRANSLITERATION = str.maketrans(GEORGIAN_TO_LATIN)
+
+def normalize_text(value):
+    """Casefolded, accent-stripped, Latin-script form of a piece of text ("" for None)"""
+    text = unicodedata.normalize("NFKD", (value or "").casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.translate(_TRANSLITERATION)
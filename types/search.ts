@@ -4,7 +4,10 @@ export interface SearchFilters {
   location?: string[];
   minRating?: number;
   maxRating?: number;
-  sortBy?: 'name' | 'rating' | 'recent' | 'distance';
+  openNow?: boolean;
+  openAt?: string;
+  mode?: 'keyword' | 'semantic' | 'hybrid';
+  sortBy?: 'name' | 'rating' | 'recent' | 'distance' | 'relevance';
   sortOrder?: 'asc' | 'desc';
   page?: number;
   limit?: number;